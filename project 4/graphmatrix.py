@@ -139,6 +139,11 @@
 #    do. The extra credit portion is worth up to 25 points.
 import math
 import copy
+import os
+import sys
+# the highway graph parser of assignment 2, in the project2 directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "project2"))
+from graphfileparser import parse_highway_graph_arrays
 class WeightedAdjacencyMatrix :
     """A weighted graph represented as a matrix."""
 
@@ -346,7 +351,9 @@ def parse_highway_graph_matrix(filename) :
     Keyword arguments:
     filename - the name of a highhway graph file.
     """
-    return None # temporary return statement until you implement this.
+    # the same parser (and binary cache) as parse_highway_graph_file
+    lat, lng, tails, heads, weights = parse_highway_graph_arrays(filename)
+    return WeightedAdjacencyMatrix(len(lat), list(zip(tails, heads)), weights)
 
 def pair_shortest_path(D, P, s, t) :
     """EXTRA CREDIT: This function takes D and P matrices (i.e., what is generated
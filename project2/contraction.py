@@ -0,0 +1,266 @@
+from array import array
+import heapq
+import math
+import struct
+from graphshw import WeightedDigraph
+
+class ContractionHierarchy :
+    """Contraction Hierarchy (Geisberger et al., 2008) of an undirected weighted
+    graph, for answering many shortest path queries on the same graph.
+
+    Preprocessing contracts the vertexes one at a time, in order of edge
+    difference, adding shortcut edges between the neighbors of each contracted
+    vertex wherever the vertex is on the only shortest path between them.
+    Every vertex is then ranked by when it was contracted, and a query only
+    needs to search upward (toward higher ranks) from both end points.
+    """
+
+    __slots__ = [ '_rank', '_up', '_middle' ]
+
+    _MAGIC = b'CHv1'
+
+    def __init__(self, G=None, settled_limit=100) :
+        """Builds the contraction hierarchy of a graph.
+
+        Keyword arguments:
+        G - an undirected WeightedGraph, such as a highway graph from
+            parse_highway_graph_file.  If None, the hierarchy is left empty,
+            which is how load constructs one.
+        settled_limit - maximum number of vertexes settled by each witness
+                        search during preprocessing.  Smaller values
+                        preprocess faster but may add unneeded shortcuts.
+        """
+        self._rank = array('q')
+        self._up = WeightedDigraph(0)
+        self._middle = {}
+        if G is not None :
+            if G._directed :
+                raise ValueError("contraction hierarchies require an undirected graph")
+            self._build(G, settled_limit)
+
+    def num_vertexes(self) :
+        """Gets number of vertexes of the graph."""
+        return len(self._rank)
+
+    def num_shortcuts(self) :
+        """Gets the number of shortcut edges added during preprocessing."""
+        return len(self._middle)
+
+    def rank(self, vertex) :
+        """Gets the position of a vertex in the contraction order.
+
+        Keyword arguments:
+        vertex - the vertex id
+        """
+        return self._rank[vertex]
+
+    def query(self, s, t) :
+        """Computes a shortest path from s to t.  Returns a pair d, path where
+        d is the weight of the path and path is a list of vertex ids of the
+        original graph from s to t.  If t is not reachable from s, returns
+        math.inf and an empty list.
+
+        Keyword arguments:
+        s - the source vertex
+        t - the target vertex
+        """
+        if s == t :
+            return 0, [s]
+        adj = self._up._adj
+        # the upward search spaces are small, so they use dicts and a heapq
+        # with lazy deletion rather than structures sized to the whole graph
+        d = [ { s : 0 }, { t : 0 } ]
+        parent = [ { s : None }, { t : None } ]
+        heaps = [ [(0, s)], [(0, t)] ]
+        best = math.inf
+        meet = None
+        side = 0
+        while len(heaps[0]) > 0 or len(heaps[1]) > 0 :
+            if len(heaps[side]) == 0 :
+                side = 1 - side
+            heap, d_this, d_other = heaps[side], d[side], d[1 - side]
+            u_d, u = heapq.heappop(heap)
+            if u_d >= best :
+                # nothing left on this side can improve the path
+                heap.clear()
+            elif u_d == d_this[u] :
+                if u in d_other and u_d + d_other[u] < best :
+                    best = u_d + d_other[u]
+                    meet = u
+                for v, w in adj[u].__iter__(True) :
+                    v_d = u_d + w
+                    if v_d < d_this.get(v, math.inf) :
+                        d_this[v] = v_d
+                        parent[side][v] = u
+                        heapq.heappush(heap, (v_d, v))
+            side = 1 - side
+        if meet is None :
+            return math.inf, []
+        up_path = []
+        v = meet
+        while v is not None :
+            up_path.append(v)
+            v = parent[0][v]
+        up_path.reverse()
+        v = parent[1][meet]
+        while v is not None :
+            up_path.append(v)
+            v = parent[1][v]
+        path = [s]
+        for a, b in zip(up_path, up_path[1:]) :
+            self._unpack(a, b, path)
+        return best, path
+
+    def save(self, filename) :
+        """Writes the hierarchy to a binary file, in the machine's native
+        byte order, so that it can be loaded without preprocessing again.
+
+        Keyword arguments:
+        filename - the name of the file
+        """
+        tails = array('q')
+        heads = array('q')
+        weights = []
+        middles = array('q')
+        for u, uList in enumerate(self._up._adj) :
+            for v, w in uList.__iter__(True) :
+                tails.append(u)
+                heads.append(v)
+                weights.append(w)
+                middles.append(self._middle.get((u, v), -1))
+        typecode = 'q' if all(type(w) is int for w in weights) else 'd'
+        with open(filename, "wb") as f :
+            f.write(struct.pack('4sqq1s', ContractionHierarchy._MAGIC,
+                                len(self._rank), len(tails), typecode.encode()))
+            self._rank.tofile(f)
+            tails.tofile(f)
+            heads.tofile(f)
+            array(typecode, weights).tofile(f)
+            middles.tofile(f)
+
+    @staticmethod
+    def load(filename) :
+        """Reads a hierarchy written by save, and returns it.
+
+        Keyword arguments:
+        filename - the name of the file
+        """
+        header = struct.Struct('4sqq1s')
+        with open(filename, "rb") as f :
+            magic, n, m, typecode = header.unpack(f.read(header.size))
+            if magic != ContractionHierarchy._MAGIC :
+                raise ValueError(filename + " is not a contraction hierarchy file")
+            arrays = []
+            for code, count in [ ('q', n), ('q', m), ('q', m), (typecode.decode(), m), ('q', m) ] :
+                a = array(code)
+                a.fromfile(f, count)
+                arrays.append(a)
+        rank, tails, heads, weights, middles = arrays
+        CH = ContractionHierarchy()
+        CH._rank = rank
+        up = WeightedDigraph(n)
+        for i in range(m) :
+            up.add_edge(tails[i], heads[i], weights[i])
+            if middles[i] >= 0 :
+                CH._middle[(tails[i], heads[i])] = middles[i]
+        CH._up = up.freeze()
+        return CH
+
+    def _unpack(self, a, b, path) :
+        # appends the original edges that the (possibly shortcut) edge from
+        # a to b stands for, not including a itself
+        stack = [ (a, b) ]
+        while len(stack) > 0 :
+            a, b = stack.pop()
+            key = (a, b) if self._rank[a] < self._rank[b] else (b, a)
+            mid = self._middle.get(key)
+            if mid is None :
+                path.append(b)
+            else :
+                stack.append((mid, b))
+                stack.append((a, mid))
+
+    def _build(self, G, settled_limit) :
+        n = G.num_vertexes()
+        # working graph of the vertexes not yet contracted, keeping only the
+        # lightest of any parallel edges, and the middle vertex of each shortcut
+        nbrs = [ {} for v in range(n) ]
+        for u, uList in enumerate(G._adj) :
+            for v, w in uList.__iter__(True) :
+                if u != v and w < nbrs[u].get(v, math.inf) :
+                    nbrs[u][v] = w
+        middle = {}
+        deleted = [ 0 ] * n
+        rank = array('q', [0]) * n
+        up = WeightedDigraph(n)
+
+        def priority(v, shortcuts) :
+            # edge difference, plus the number of contracted neighbors to
+            # spread the contraction evenly over the graph
+            return len(shortcuts) - len(nbrs[v]) + deleted[v]
+
+        order = [ (priority(v, self._shortcuts(nbrs, v, settled_limit)), v) for v in range(n) ]
+        heapq.heapify(order)
+        level = 0
+        while len(order) > 0 :
+            p, v = heapq.heappop(order)
+            # lazy update: priorities go stale as neighbors are contracted
+            shortcuts = self._shortcuts(nbrs, v, settled_limit)
+            p = priority(v, shortcuts)
+            if len(order) > 0 and p > order[0][0] :
+                heapq.heappush(order, (p, v))
+                continue
+            rank[v] = level
+            level += 1
+            for u, w in nbrs[v].items() :
+                up.add_edge(v, u, w)
+                key = (v, u) if v < u else (u, v)
+                if key in middle :
+                    self._middle[(v, u)] = middle.pop(key)
+                del nbrs[u][v]
+                deleted[u] += 1
+            nbrs[v] = None
+            for u, x, w in shortcuts :
+                if w < nbrs[u].get(x, math.inf) :
+                    nbrs[u][x] = nbrs[x][u] = w
+                    middle[(u, x) if u < x else (x, u)] = v
+        self._rank = rank
+        self._up = up.freeze()
+
+    def _shortcuts(self, nbrs, v, settled_limit) :
+        # the shortcuts needed to contract v: one for each pair of neighbors
+        # u, x with no witness path of weight at most w(u,v) + w(v,x) avoiding v
+        neighbors = list(nbrs[v].items())
+        shortcuts = []
+        for i, (u, w_u) in enumerate(neighbors) :
+            others = neighbors[i+1:]
+            if len(others) == 0 :
+                break
+            limit = w_u + max(w_x for x, w_x in others)
+            dist = _witness_search(nbrs, u, v, limit, settled_limit)
+            for x, w_x in others :
+                if dist.get(x, math.inf) > w_u + w_x :
+                    shortcuts.append((u, x, w_u + w_x))
+        return shortcuts
+
+def _witness_search(nbrs, source, skip, limit, settled_limit) :
+    # Dijkstra from source in the working graph without vertex skip, stopping
+    # at distance limit or after settled_limit vertexes.  Tentative distances
+    # are weights of real paths, so all of them can serve as witnesses.
+    dist = { source : 0 }
+    heap = [ (0, source) ]
+    settled = 0
+    while len(heap) > 0 :
+        u_d, u = heapq.heappop(heap)
+        if u_d > dist[u] :
+            continue
+        if u_d > limit or settled == settled_limit :
+            break
+        settled += 1
+        for x, w in nbrs[u].items() :
+            if x != skip :
+                x_d = u_d + w
+                if x_d < dist.get(x, math.inf) :
+                    dist[x] = x_d
+                    heapq.heappush(heap, (x_d, x))
+    return dist
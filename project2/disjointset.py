@@ -6,15 +6,21 @@
 # of enrollment only.  All other use prohibited.
 # Redistribution is prohibited.
 
+from array import array
+
 class DisjointIntegerSets :
     """Disjoint Set Forests of Integers: Representation of disjoint sets.
 
     Disjoint sets of the integers from [0,n) represented as disjoint set forest.
-    This implementation uses both the union by rank heuristic, as well as
-    path compression.
+    This implementation uses both the union by size heuristic, as well as
+    path compression (by path halving).
+
+    The forest is a single flat array of parents, in which each root instead
+    holds the negated size of its set, so a forest of n elements is one C level
+    allocation rather than n objects.
     """
 
-    __slots__ = ["_nodes"]
+    __slots__ = ["_parent"]
 
     def __init__(self, n) :
         """Initializes disjoint set forest.
@@ -26,29 +32,29 @@ class DisjointIntegerSets :
         n -- number of elements in disjoint set forest.
         """
 
-        self._nodes = [ self._makeset(i) for i in range(n) ]
+        self._parent = array('q', [-1]) * n
 
     def union(self,x,y) :
         """Computes the union of the sets containing x and y.
 
-        Uses union by rank heuristic in computing union of sets containing x and y.
-        the "shorter" tree is added as child of "taller" tree.  Though heights are
-        approximate since ranks are upper bounds only.
+        Uses union by size heuristic in computing union of sets containing x and y.
+        The root of the smaller tree is made a child of the root of the larger tree.
+        Returns False if x and y were already in the same set, and True otherwise.
 
         Keyword arguments:
         x -- an element
         y -- an element
         """
-        self._link(self.findset(x), self.findset(y))
+        return self._link(self.findset(x), self.findset(y))
 
 
     def findset(self,x) :
         """Finds the set for a given element, and performs path compression.
 
         Finds the set for a given element, returning the integer at the root of its
-        tree in the forest.  The find also performs path compression, resetting the parents
-        of all nodes along path to root to point directly to root.  Path compression does not
-        reset ranks, thus ranks are upper bounds only.
+        tree in the forest.  The find also performs path compression by path halving,
+        iteratively resetting the parent of every other node along the path to root
+        to its grandparent.
 
         Returns a representative member of the set, namely the root of the set's tree.
         Subsequent calls to the union method may change which element is root, but otherwise
@@ -57,33 +63,389 @@ class DisjointIntegerSets :
         Keyword arguments:
         x -- the element whose set we want to find
         """
-        # perform path compression during the find
-        if x != self._nodes[x].p :
-            self._nodes[x].p = self.findset(self._nodes[x].p)
-        return self._nodes[x].p
+        parent = self._parent
+        while True :
+            p = parent[x]
+            if p < 0 :
+                return x
+            g = parent[p]
+            if g < 0 :
+                return p
+            parent[x] = g
+            x = g
+
+    def _link(self, x, y) :
+        # union by size heuristic: attach the root of the smaller tree as child
+        # of the root of the larger tree, where roots hold their negated sizes
+        # returns False if x and y are already the same set
+        if x == y :
+            return False
+        parent = self._parent
+        if parent[x] < parent[y] :
+            x, y = y, x
+        parent[y] += parent[x]
+        parent[x] = y
+        return True
+
+    def connected(self, x, y) :
+        """Checks if x and y are in the same set.
+
+        Keyword arguments:
+        x -- an element
+        y -- an element
+        """
+        return self.findset(x) == self.findset(y)
 
-    def _makeset(self,x) :
-        """Creates a set containing only element x, adding set to forest.
+    def set_size(self, x) :
+        """Gets the number of elements of the set containing x.
 
-        
         Keyword arguments:
-        x -- an element of any hashable type
+        x -- an element
         """
-        class _DJSetNode :
-            __slots__ = ['p','rank']
+        return -self._parent[self.findset(x)]
+
+    def union_all(self, edges) :
+        """Computes the union of the sets containing x and y for every pair
+        (x, y) of an iterable, such as a list of edges or zip(tails, heads),
+        in a single loop without a call to findset per element.  Returns the
+        number of pairs that were in different sets, which is the number of sets
+        that were merged away.
+
+        Keyword arguments:
+        edges -- iterable of pairs of elements
+        """
+        parent = self._parent
+        merged = 0
+        for x, y in edges :
+            # findset of x and y, inlined
+            while True :
+                p = parent[x]
+                if p < 0 :
+                    break
+                g = parent[p]
+                if g < 0 :
+                    x = p
+                    break
+                parent[x] = g
+                x = g
+            while True :
+                p = parent[y]
+                if p < 0 :
+                    break
+                g = parent[p]
+                if g < 0 :
+                    y = p
+                    break
+                parent[y] = g
+                y = g
+            if x != y :
+                if parent[x] < parent[y] :
+                    x, y = y, x
+                parent[y] += parent[x]
+                parent[x] = y
+                merged += 1
+        return merged
+
+    def labels(self) :
+        """Returns an array with a dense set label, from 0 to the number of sets
+        minus 1, for each element.  Sets are labeled in order of their smallest
+        elements, so element 0 is always in set 0.
+        """
+        return self._label_sets()[0]
+
+    def component_sizes(self) :
+        """Returns an array with the size of each set, indexed by the set labels
+        of the labels method.
+        """
+        return self._label_sets()[1]
+
+    def members(self, x) :
+        """Returns a list, in increasing order, of the elements of the set
+        containing x.
+
+        Keyword arguments:
+        x -- an element
+        """
+        root = self.findset(x)
+        self._compress()
+        parent = self._parent
+        return [ y for y in range(len(parent)) if parent[y] == root or y == root ]
+
+    def _compress(self) :
+        # points every element directly to the root of its tree
+        parent = self._parent
+        for x in range(len(parent)) :
+            p = parent[x]
+            if p >= 0 :
+                while parent[p] >= 0 :
+                    p = parent[p]
+                parent[x] = p
+
+    def _label_sets(self) :
+        self._compress()
+        parent = self._parent
+        n = len(parent)
+        labels = array('q', [-1]) * n
+        sizes = array('q')
+        for x in range(n) :
+            root = x if parent[x] < 0 else parent[x]
+            if labels[root] < 0 :
+                labels[root] = len(sizes)
+                sizes.append(-parent[root])
+            labels[x] = labels[root]
+        return labels, sizes
+
+
+class GrowableDisjointIntegerSets(DisjointIntegerSets) :
+    """Disjoint Set Forests of Integers that can grow: Representation of
+    disjoint sets of the integers from [0,n), where new integers can be added
+    at any time, such as new vertex ids arriving in a stream of edges.
+
+    Adding an element is amortized O(1), by growing the array of parents,
+    and the number of sets is kept up to date as elements are added and sets
+    are merged.
+    """
+
+    __slots__ = ["_num_sets"]
+
+    def __init__(self, n=0) :
+        """Initializes disjoint set forest.
+
+        Initializes disjoint sets of the integers in interval [0..n-1],
+        each initially in a set by itself.
+
+        Keyword arguments:
+        n -- initial number of elements in disjoint set forest (default 0).
+        """
+        super().__init__(n)
+        self._num_sets = n
+
+    def add(self) :
+        """Adds the next integer, in a set by itself, and returns it."""
+        self._parent.append(-1)
+        self._num_sets += 1
+        return len(self._parent) - 1
+
+    def num_elements(self) :
+        """Gets the number of elements."""
+        return len(self._parent)
+
+    def num_sets(self) :
+        """Gets the number of disjoint sets."""
+        return self._num_sets
+
+    def union_all(self, edges) :
+        """Computes the union of the sets containing x and y for every pair
+        (x, y) of an iterable, as in DisjointIntegerSets.union_all, and returns
+        the number of sets that were merged away.
+
+        Keyword arguments:
+        edges -- iterable of pairs of elements
+        """
+        merged = super().union_all(edges)
+        self._num_sets -= merged
+        return merged
 
-        node = _DJSetNode()
-        node.p = x
-        node.rank = 0
-        return node
-             
     def _link(self, x, y) :
-        # union by rank heuristic: attach approximately "shorter" tree as child of approximately "taller" tree
-        if self._nodes[x].rank > self._nodes[y].rank :
-            self._nodes[y].p = x
-        else :
-            self._nodes[x].p = y
-            if self._nodes[x].rank == self._nodes[y].rank :
-                self._nodes[y].rank += 1
+        if super()._link(x, y) :
+            self._num_sets -= 1
+            return True
+        return False
 
 
+class RollbackDisjointIntegerSets :
+    """Disjoint Set Forests of Integers with rollback: Representation of
+    disjoint sets of the integers from [0,n), where unions can be undone.
+
+    This implementation uses the union by size heuristic, but not path
+    compression, which would change the forest in ways that cannot be cheaply
+    undone.  Trees therefore stay of height O(log n), and findset is O(log n).
+    Every union is recorded, so that rollback can undo the unions back to the
+    most recent checkpoint.
+    """
+
+    __slots__ = ["_parent", "_children", "_sizes", "_checkpoints", "_num_sets"]
+
+    def __init__(self, n) :
+        """Initializes disjoint set forest.
+
+        Initializes disjoint sets of the integers in interval [0..n-1],
+        each initially in a set by itself.
+
+        Keyword arguments:
+        n -- number of elements in disjoint set forest.
+        """
+        # as in DisjointIntegerSets, roots hold their negated set sizes
+        self._parent = array('q', [-1]) * n
+        # each union's new child root, and that root's negated size before it
+        self._children = array('q')
+        self._sizes = array('q')
+        self._checkpoints = []
+        self._num_sets = n
+
+    def findset(self, x) :
+        """Finds the set for a given element, returning the integer at the root
+        of its tree in the forest.
+
+        Keyword arguments:
+        x -- the element whose set we want to find
+        """
+        parent = self._parent
+        while parent[x] >= 0 :
+            x = parent[x]
+        return x
+
+    def union(self, x, y) :
+        """Computes the union of the sets containing x and y, returning False
+        if they are already the same set and True otherwise.
+
+        Keyword arguments:
+        x -- an element
+        y -- an element
+        """
+        x = self.findset(x)
+        y = self.findset(y)
+        if x == y :
+            return False
+        parent = self._parent
+        if parent[x] < parent[y] :
+            x, y = y, x
+        self._children.append(x)
+        self._sizes.append(parent[x])
+        parent[y] += parent[x]
+        parent[x] = y
+        self._num_sets -= 1
+        return True
+
+    def connected(self, x, y) :
+        """Checks if x and y are in the same set.
+
+        Keyword arguments:
+        x -- an element
+        y -- an element
+        """
+        return self.findset(x) == self.findset(y)
+
+    def set_size(self, x) :
+        """Gets the number of elements of the set containing x.
+
+        Keyword arguments:
+        x -- an element
+        """
+        return -self._parent[self.findset(x)]
+
+    def num_sets(self) :
+        """Gets the number of disjoint sets."""
+        return self._num_sets
+
+    def checkpoint(self) :
+        """Records the current sets, for a later rollback to return to."""
+        self._checkpoints.append(len(self._children))
+
+    def rollback(self) :
+        """Undoes the unions since the most recent checkpoint, and removes
+        that checkpoint.
+        """
+        if len(self._checkpoints) == 0 :
+            raise IndexError("rollback without a checkpoint")
+        mark = self._checkpoints.pop()
+        parent = self._parent
+        children = self._children
+        sizes = self._sizes
+        while len(children) > mark :
+            x = children.pop()
+            size = sizes.pop()
+            parent[parent[x]] -= size
+            parent[x] = size
+            self._num_sets += 1
+
+
+def offline_connectivity(n, operations) :
+    """Answers connectivity queries on a graph whose edges are added and removed
+    over time, given the whole sequence of changes and queries in advance.
+    Returns a list with the answer to each query, in order.
+
+    Each edge is alive during an interval of the queries, and is unioned into a
+    RollbackDisjointIntegerSets at the O(log Q) nodes of a segment tree over
+    the queries that cover its interval.  A depth first traversal of the
+    segment tree unions each node's edges on the way down, answers a query at
+    each leaf, and rolls the unions back on the way up, for O((E + Q) log Q log n)
+    total time for E edge changes and Q queries.
+
+    Keyword arguments:
+    n -- number of vertexes, with ids from 0 to n - 1
+    operations -- sequence of tuples, each one of:
+                  ("add", u, v) to add an edge (u, v),
+                  ("remove", u, v) to remove an edge (u, v) that was added,
+                  ("connected", u, v) to query if u and v are connected, or
+                  ("count",) to query the number of connected components.
+    """
+    queries = []
+    # open intervals of the edges, as lists of the query indexes at which the
+    # currently added copies of each edge were added
+    added = {}
+    intervals = []
+    for op in operations :
+        if op[0] == "connected" or op[0] == "count" :
+            queries.append(op)
+        elif op[0] == "add" or op[0] == "remove" :
+            u, v = op[1], op[2]
+            key = (u, v) if u <= v else (v, u)
+            if op[0] == "add" :
+                added.setdefault(key, []).append(len(queries))
+            else :
+                if len(added.get(key, [])) == 0 :
+                    raise ValueError("removing edge " + str(key) + " that was not added")
+                intervals.append((added[key].pop(), len(queries), key))
+        else :
+            raise ValueError("unknown operation: " + str(op[0]))
+    for key, starts in added.items() :
+        for start in starts :
+            intervals.append((start, len(queries), key))
+    if len(queries) == 0 :
+        return []
+    size = 1
+    while size < len(queries) :
+        size *= 2
+    # node i of the segment tree has children 2i and 2i+1, and leaf size+q
+    # is query q; each node lists the edges alive throughout its leaves
+    tree = [ [] for i in range(2 * size) ]
+    for lo, hi, key in intervals :
+        lo += size
+        hi += size
+        while lo < hi :
+            if lo & 1 :
+                tree[lo].append(key)
+                lo += 1
+            if hi & 1 :
+                hi -= 1
+                tree[hi].append(key)
+            lo //= 2
+            hi //= 2
+    D = RollbackDisjointIntegerSets(n)
+    answers = []
+    # iterative depth first traversal, where a negative entry on the stack is
+    # the node to roll back on the way up
+    stack = [ 1 ]
+    while len(stack) > 0 :
+        node = stack.pop()
+        if node < 0 :
+            D.rollback()
+            continue
+        if node >= size + len(queries) :
+            # subtree without any queries
+            continue
+        D.checkpoint()
+        for u, v in tree[node] :
+            D.union(u, v)
+        stack.append(-node)
+        if node >= size :
+            query = queries[node - size]
+            if query[0] == "count" :
+                answers.append(D.num_sets())
+            else :
+                answers.append(D.connected(query[1], query[2]))
+        else :
+            stack.append(2 * node + 1)
+            stack.append(2 * node)
+    return answers
@@ -0,0 +1,152 @@
+import heapq
+import math
+
+class DynamicShortestPaths :
+    """Single source shortest paths of a weighted graph, maintained as the
+    weights of its edges change and edges are added.
+
+    After a change, only the shortest paths that the change affects are
+    repaired, as in Ramalingam and Reps (1996): a weight decrease propagates
+    improved distances outward from the edge, and a weight increase on an edge
+    of the shortest path tree recomputes only the subtree below that edge.
+    Edge weights must be nonnegative.
+    """
+
+    __slots__ = [ '_G', '_R', '_s', '_d', '_parent' ]
+
+    def __init__(self, G, s) :
+        """Computes the shortest paths from a source vertex.  The graph
+        must not be frozen, and should only be changed through this object
+        from now on, so that the shortest paths are kept up to date.
+
+        Keyword arguments:
+        G - a WeightedGraph or WeightedDigraph
+        s - the source vertex
+        """
+        self._G = G
+        # the reversed edges, which are the graph itself if undirected
+        self._R = G.transpose() if G._directed else G
+        self._s = s
+        n = G.num_vertexes()
+        self._d = [ math.inf ] * n
+        self._parent = [ None ] * n
+        for v, d, parent in G.dijkstra_binheap(s) :
+            self._d[v] = d
+            self._parent[v] = parent
+
+    def results(self) :
+        """Returns a list of 3-tuples, one for each vertex in order of vertex
+        id, of the same form as the results of WeightedGraph.dijkstra_binheap:
+        (vertex, distance from the source, parent)."""
+        return [ (v, d, self._parent[v]) for v, d in enumerate(self._d) ]
+
+    def distance(self, v) :
+        """Gets the weight of a shortest path from the source to v.
+
+        Keyword arguments:
+        v - the vertex id
+        """
+        return self._d[v]
+
+    def parent(self, v) :
+        """Gets v's parent in the shortest path tree.
+
+        Keyword arguments:
+        v - the vertex id
+        """
+        return self._parent[v]
+
+    def set_weight(self, a, b, w) :
+        """Changes the weight of the edge (a, b) and repairs the shortest paths.
+        Returns True if the graph has an edge (a, b) and False otherwise.
+
+        Keyword arguments:
+        a - first end point (source vertex of a directed edge)
+        b - second end point (target vertex of a directed edge)
+        w - the new weight
+        """
+        arcs = self._arcs(a, b)
+        old = [ self._arc_weight(x, y) for x, y in arcs ]
+        if not self._G.set_weight(a, b, w) :
+            return False
+        if self._R is not self._G :
+            self._R.set_weight(b, a, w)
+        self._repair(arcs, old)
+        return True
+
+    def add_edge(self, a, b, w=1) :
+        """Adds an edge (a, b) to the graph and repairs the shortest paths.
+
+        Keyword arguments:
+        a - first end point (source vertex of a directed edge)
+        b - second end point (target vertex of a directed edge)
+        w - the weight
+        """
+        arcs = self._arcs(a, b)
+        old = [ self._arc_weight(x, y) for x, y in arcs ]
+        self._G.add_edge(a, b, w)
+        if self._R is not self._G :
+            self._R.add_edge(b, a, w)
+        self._repair(arcs, old)
+
+    def _arcs(self, a, b) :
+        # directed edges represented by the edge (a, b)
+        if self._G._directed or a == b :
+            return [ (a, b) ]
+        return [ (a, b), (b, a) ]
+
+    def _arc_weight(self, a, b) :
+        # weight of the lightest edge from a to b
+        return min((w for v, w in self._G._adj[a].__iter__(True) if v == b), default=math.inf)
+
+    def _repair(self, arcs, old) :
+        d = self._d
+        parent = self._parent
+        # an increase only matters for an edge of the shortest path tree
+        roots = [ b for (a, b), w in zip(arcs, old)
+                  if parent[b] == a and self._arc_weight(a, b) > w ]
+        heap = []
+        if len(roots) > 0 :
+            affected = self._subtree(roots)
+            for x in affected :
+                d[x] = math.inf
+                parent[x] = None
+            # best path into each affected vertex from an unaffected one
+            for x in affected :
+                for y, w in self._R._adj[x].__iter__(True) :
+                    if y not in affected and d[y] + w < d[x] :
+                        d[x] = d[y] + w
+                        parent[x] = y
+                if d[x] < math.inf :
+                    heap.append((d[x], x))
+            heapq.heapify(heap)
+        for a, b in arcs :
+            w = self._arc_weight(a, b)
+            if d[a] + w < d[b] :
+                d[b] = d[a] + w
+                parent[b] = a
+                heapq.heappush(heap, (d[b], b))
+        # Dijkstra from the repaired vertexes, with lazy deletion of stale
+        # entries, which only reaches vertexes whose distances improve
+        while len(heap) > 0 :
+            u_d, u = heapq.heappop(heap)
+            if u_d > d[u] :
+                continue
+            for v, w in self._G._adj[u].__iter__(True) :
+                if u_d + w < d[v] :
+                    d[v] = u_d + w
+                    parent[v] = u
+                    heapq.heappush(heap, (d[v], v))
+
+    def _subtree(self, roots) :
+        # vertexes of the shortest path tree below (and including) the roots
+        parent = self._parent
+        affected = set(roots)
+        stack = list(roots)
+        while len(stack) > 0 :
+            u = stack.pop()
+            for v in self._G._adj[u] :
+                if parent[v] == u and v not in affected :
+                    affected.add(v)
+                    stack.append(v)
+        return affected
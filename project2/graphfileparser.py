@@ -155,9 +155,20 @@
 # page linked to earlier and verify that your function computes the same).
 #
 
+from array import array
 from graphshw import WeightedGraph
+from itertools import repeat
+from multiprocessing import Pool
+import hashlib
 import math
+import mmap
+import os
+import struct
 import sys
+try :
+    import numpy as np
+except ImportError :
+    np = None
 
 def haversine(lat1, lng1, lat2, lng2) :
     """Computes haversine distance between two points in latitude, longitude.
@@ -189,13 +200,76 @@ def haversine(lat1, lng1, lat2, lng2) :
     return radius * c
 
 
-def parse_highway_graph_file(filename) :
+def haversine_many(lat1, lng1, lat2, lng2) :
+    """Computes haversine distances between many pairs of points at once,
+    with NumPy if it is available, and otherwise in a single loop.
+
+    Keyword Arguments:
+    lat1 -- latitudes of the first point of each pair
+    lng1 -- longitudes of the first point of each pair
+    lat2 -- latitudes of the second point of each pair
+    lng2 -- longitudes of the second point of each pair
+
+    Each argument is either a sequence (such as a list, array, or NumPy
+    array), all of the same length, or a single number that is used for
+    every pair, such as the coordinates of one point to measure to.
+
+    Returns an array('d') of the haversine distances in meters.
+    """
+    args = [lat1, lng1, lat2, lng2]
+    scalar = [ isinstance(x, (int, float)) for x in args ]
+    if all(scalar) :
+        return array('d', [ haversine(lat1, lng1, lat2, lng2) ])
+    if np is not None :
+        rad_lat1, rad_lng1, rad_lat2, rad_lng2 = [ np.radians(np.asarray(x, dtype=np.float64)) for x in args ]
+        theta = np.sin((rad_lat2 - rad_lat1) / 2) ** 2 + np.sin((rad_lng2 - rad_lng1) / 2) ** 2 \
+                * np.cos(rad_lat1) * np.cos(rad_lat2)
+        c = 2 * np.arctan2(np.sqrt(theta), np.sqrt(1 - theta))
+        return array('d', (6371e3 * c).tobytes())
+    # the same formula as haversine, with the functions looked up once
+    radians, sin, cos, sqrt, atan2 = math.radians, math.sin, math.cos, math.sqrt, math.atan2
+    args = [ repeat(x) if is_scalar else x for x, is_scalar in zip(args, scalar) ]
+    distances = array('d')
+    for a1, b1, a2, b2 in zip(*args) :
+        a1 = radians(a1)
+        a2 = radians(a2)
+        theta = sin((a2 - a1) / 2) ** 2 + sin((radians(b2) - radians(b1)) / 2) ** 2 * cos(a1) * cos(a2)
+        distances.append(6371e3 * (2 * atan2(sqrt(theta), sqrt(1 - theta))))
+    return distances
+
+
+# binary cache of a parsed highway graph file, written next to it as the
+# file's name followed by CACHE_SUFFIX: a header, then the latitudes and
+# longitudes of the vertexes, the end points of the edges, and the edge
+# weights, as flat arrays in the machine's native byte order
+CACHE_SUFFIX = ".tmgcache"
+_CACHE_HEADER = struct.Struct('4sqqq16sqq')
+_CACHE_MAGIC = b'TMC1'
+
+def parse_highway_graph_file(filename, frozen=False, cache=True, workers=None) :
     """Parses a highway graph file and return a WeightedGraph
     representing a highway graph.
 
+    The file is memory mapped and each section is split into tokens
+    all at once, so that the vertex coordinates and edge end points
+    go straight into flat arrays without a Python loop per line.
+
+    Supports the simple, collapsed, and traveled formats.  Edges of the
+    collapsed and traveled formats may have shaping points, and their
+    weights are the haversine lengths along their shaping points.
+
     Keyword arguments:
     filename -- The name of the file containing the highway
     graph data relative to the current working directory.
+    frozen -- If True, returns a frozen graph (see WeightedGraph.freeze)
+    built directly from the edge arrays, which is much faster to
+    construct for large graphs, but can't have edges added.
+    cache -- If True, loads the graph from the binary cache file
+    next to the highway graph file if the cache is up to date, and
+    otherwise parses the highway graph file and writes the cache.
+    workers -- If more than 1, the number of processes that parse the
+    file in parallel, each a range of its lines.  The graph is the
+    same as the one parsed by a single process (the default).
     """
     # Hint 1: There are a couple different ways of structuring your code.
     # Here is one way:
@@ -218,52 +292,326 @@ def parse_highway_graph_file(filename) :
     # to return the WeightedGraph object after you've constructed one.
     # So just replace None below with whatever you named your graph variable.
 
-    # "with open" passes the filename creating a file object and opening it
-    with open(filename) as my_file:
-        # call readline twice, passing second line of file
-        my_file.readline()
-        # parse this line as 2 variables for vertices and edges
-        # map to int using the string array
-        vertices, edges = map(int, my_file.readline().split())
-        # create 2 lists to hold longitude / latitude and edge weights
-        lat_long = []
-        edge_weights = []
-        # read lines up to the number of vertices (lat/long values)
-        # and edge weights to get the data accurately
-        # for i in range 0 to vertices - 1,
-        for i in range(vertices):
-            # split the next line into 3 strings
-            coords = my_file.readline().split()
-            # we only want the numbers
-            # map to float excluding the string ID
-            latitude, longitude = map(float, coords[1:3])
-            # add the latitude and longitude values to a
-            # tuple stored in the lat / long list
-            lat_long.append((latitude, longitude))
-        # read the rest of the lines in the file to get edge weights
-        # for i in range 0 to edges - 1,
-        for i in range(edges):
-            # split the next line into 3 strings
-            weights = my_file.readline().split()
-            # map to int excluding 3rd value
-            w1, w2 = map(int, weights[:2])
-            # add the next line weights to a tuple stored in the edges list
-            edge_weights.append((w1, w2))
-    # create and populate the weighted graph using the lists of tuples created from the text file
-    my_graph = WeightedGraph(vertices)
-    for i in range(edges):
-        # add edges by iterating each tuple
-        a, b = edge_weights[i].__iter__()
-        # get lat / lng of vertices with corresponding edges
-        lat1, lng1 = lat_long[a].__iter__()
-        lat2, lng2 = lat_long[b].__iter__()
-        # calculate edge weight using haversine
-        weight = haversine(lat1, lng1, lat2, lng2)
-        # add the edge
-        my_graph.add_edge(a, b, weight)
+    lat, lng, tails, heads, weights = parse_highway_graph_arrays(filename, cache, workers)
+    if frozen :
+        my_graph = WeightedGraph.from_edge_arrays(len(lat), tails, heads, weights)
+    else :
+        # create and populate the weighted graph, adding the edges in order
+        my_graph = WeightedGraph(len(lat))
+        for i in range(len(tails)) :
+            my_graph.add_edge(tails[i], heads[i], weights[i])
+    # keep the vertex coordinates on the graph for A* routing
+    my_graph.set_coordinates(lat, lng)
     # return the graph
     return my_graph
 
+
+def parse_highway_graph_arrays(filename, cache=True, workers=None) :
+    """Parses a highway graph file, as parse_highway_graph_file does,
+    but returns flat arrays rather than a graph, for building other
+    representations of highway graphs: lat, lng, tails, heads, weights,
+    where lat and lng are the latitudes and longitudes of the vertexes,
+    and tails, heads, and weights are the end points and weights of the
+    edges.
+
+    Keyword arguments:
+    filename -- The name of the file containing the highway
+    graph data relative to the current working directory.
+    cache -- If True, uses or writes the binary cache file (see
+    parse_highway_graph_file).
+    workers -- Number of processes that parse the file (see
+    parse_highway_graph_file).
+    """
+    arrays = _read_cache(filename) if cache else None
+    if arrays is not None :
+        return arrays
+    if workers is not None and workers > 1 :
+        lat, lng, tails, heads, shapes = _parse_tmg_parallel(filename, workers)
+    else :
+        lat, lng, tails, heads, shapes = _parse_tmg(filename)
+    # calculate all of the edge weights using haversine at once
+    weights = _edge_lengths(lat, lng, tails, heads, shapes)
+    if cache :
+        _write_cache(filename, lat, lng, tails, heads, weights)
+    return lat, lng, tails, heads, weights
+
+
+def _file_digest(filename) :
+    # hash of the contents of a file
+    with open(filename, "rb") as f :
+        if os.fstat(f.fileno()).st_size == 0 :
+            return hashlib.blake2b(digest_size=16).digest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data :
+            return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _read_cache(filename) :
+    # the arrays from the cache of a highway graph file, or None if there
+    # is no cache, or it is not of the file's current contents: it is
+    # up to date if the file's size and modification time are the same
+    # as when it was written, or if they differ only in time and the
+    # file's hash is the same
+    cache_name = filename + CACHE_SUFFIX
+    try :
+        stat = os.stat(filename)
+        with open(cache_name, "rb") as f :
+            data = f.read()
+    except OSError :
+        return None
+    if len(data) < _CACHE_HEADER.size :
+        return None
+    magic, size, mtime, one, digest, vertices, edges = _CACHE_HEADER.unpack_from(data)
+    # the 1 written with the header reads as 1 only in the same byte order
+    if magic != _CACHE_MAGIC or one != 1 or size != stat.st_size \
+       or len(data) != _CACHE_HEADER.size + 8 * (2 * vertices + 3 * edges) :
+        return None
+    if mtime != stat.st_mtime_ns :
+        if digest != _file_digest(filename) :
+            return None
+        # same contents, so record the new time to skip the hash next time
+        try :
+            with open(cache_name, "r+b") as f :
+                f.write(_CACHE_HEADER.pack(magic, size, stat.st_mtime_ns, one, digest, vertices, edges))
+        except OSError :
+            pass
+    arrays = []
+    view = memoryview(data)
+    offset = _CACHE_HEADER.size
+    for typecode, count in [ ('d', vertices), ('d', vertices), ('q', edges), ('q', edges), ('d', edges) ] :
+        a = array(typecode)
+        a.frombytes(view[offset:offset + 8 * count])
+        arrays.append(a)
+        offset += 8 * count
+    return arrays
+
+
+def _write_cache(filename, lat, lng, tails, heads, weights) :
+    # writes the cache of a highway graph file, if its directory is writable,
+    # to a temporary file that then replaces any old cache all at once
+    cache_name = filename + CACHE_SUFFIX
+    temp_name = cache_name + "." + str(os.getpid())
+    try :
+        stat = os.stat(filename)
+        with open(temp_name, "wb") as f :
+            f.write(_CACHE_HEADER.pack(_CACHE_MAGIC, stat.st_size, stat.st_mtime_ns, 1,
+                                       _file_digest(filename), len(lat), len(tails)))
+            for a in [ lat, lng, tails, heads, weights ] :
+                a.tofile(f)
+        os.replace(temp_name, cache_name)
+    except OSError :
+        try :
+            os.remove(temp_name)
+        except OSError :
+            pass
+
+
+def _edge_lengths(lat, lng, tails, heads, shapes=None) :
+    # haversine length of each edge, gathering the end point coordinates
+    # with NumPy fancy indexing if it is available
+    if shapes is not None :
+        return _polyline_lengths(lat, lng, tails, heads, *shapes)
+    if np is not None :
+        lat = np.asarray(lat)
+        lng = np.asarray(lng)
+        tails = np.asarray(tails)
+        heads = np.asarray(heads)
+        return haversine_many(lat[tails], lng[tails], lat[heads], lng[heads])
+    return haversine_many([ lat[a] for a in tails ], [ lng[a] for a in tails ],
+                          [ lat[b] for b in heads ], [ lng[b] for b in heads ])
+
+
+def _polyline_lengths(lat, lng, tails, heads, counts, shape_lat, shape_lng) :
+    # haversine length of each edge along its shaping points: the lengths
+    # of all of the segments come from one call to haversine_many, and the
+    # segments of each edge are then summed in order from its tail to its
+    # head, so an edge without shaping points has the same length as in
+    # the simple format
+    if np is not None :
+        lat = np.asarray(lat)
+        lng = np.asarray(lng)
+        tails = np.asarray(tails)
+        heads = np.asarray(heads)
+        counts = np.asarray(counts)
+        # each edge's points: its tail, its shaping points, and its head
+        first = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1] + 2, out=first[1:])
+        last = first + counts + 1
+        interior = np.ones(len(shape_lat) + 2 * len(counts), dtype=bool)
+        interior[first] = False
+        interior[last] = False
+        points_lat = np.empty(len(interior))
+        points_lng = np.empty(len(interior))
+        points_lat[first], points_lng[first] = lat[tails], lng[tails]
+        points_lat[last], points_lng[last] = lat[heads], lng[heads]
+        points_lat[interior], points_lng[interior] = np.asarray(shape_lat), np.asarray(shape_lng)
+        # a segment starts at every point but the last of each edge
+        not_last = np.ones(len(interior), dtype=bool)
+        not_last[last] = False
+        starts = np.flatnonzero(not_last)
+        segments = np.asarray(haversine_many(points_lat[starts], points_lng[starts],
+                                             points_lat[starts + 1], points_lng[starts + 1]))
+        # edge i's segments are at first[i] - i onward, and the sums go
+        # segment by segment over all of the edges with that many
+        first -= np.arange(len(counts))
+        weights = segments[first]
+        for j in range(1, int(counts.max(initial=0)) + 1) :
+            longer = counts >= j
+            weights[longer] += segments[first[longer] + j]
+        return array('d', weights.tobytes())
+    lat1, lng1, lat2, lng2 = array('d'), array('d'), array('d'), array('d')
+    offset = 0
+    for i, count in enumerate(counts) :
+        points_lat = [ lat[tails[i]] ] + list(shape_lat[offset:offset + count]) + [ lat[heads[i]] ]
+        points_lng = [ lng[tails[i]] ] + list(shape_lng[offset:offset + count]) + [ lng[heads[i]] ]
+        offset += count
+        lat1.extend(points_lat[:-1])
+        lng1.extend(points_lng[:-1])
+        lat2.extend(points_lat[1:])
+        lng2.extend(points_lng[1:])
+    segments = haversine_many(lat1, lng1, lat2, lng2)
+    weights = array('d')
+    offset = 0
+    for count in counts :
+        total = segments[offset]
+        for j in range(offset + 1, offset + count + 1) :
+            total += segments[j]
+        weights.append(total)
+        offset += count + 1
+    return weights
+
+
+# the supported formats of highway graph files, with the position on each
+# edge line of the first shaping point, after the from, to, label, and (in
+# the traveled format) the travelers fields, or None if there are none
+_TMG_FORMATS = { b"simple" : None, b"collapsed" : 3, b"traveled" : 4 }
+
+
+def _parse_tmg(filename) :
+    # returns arrays of the latitudes and longitudes of the vertexes, and
+    # the two end points of each edge, and for the formats with shaping
+    # points, a tuple of arrays of the number of shaping points of each
+    # edge and their latitudes and longitudes (or None for simple format)
+    with open(filename, "rb") as my_file :
+        with mmap.mmap(my_file.fileno(), 0, access=mmap.ACCESS_READ) as data :
+            first_point, vertices, edges = _parse_tmg_header(filename, data)
+            # one bytes object per line, split in a single call
+            lines = data[data.tell():].split(b"\n", vertices + edges)
+    lat, lng = _parse_vertex_lines(lines[:vertices])
+    tails, heads, shapes = _parse_edge_lines(lines[vertices:vertices + edges], first_point)
+    return lat, lng, tails, heads, shapes
+
+
+def _parse_tmg_header(filename, data) :
+    # reads the two header lines, returning the position of the first
+    # shaping point of the file's format, and the numbers of vertexes and edges
+    # header line is: TMG version format
+    header = data.readline().split()
+    if len(header) != 3 or header[0] != b"TMG" or header[2] not in _TMG_FORMATS :
+        raise ValueError(filename + " is not a highway graph file of a supported format")
+    # the traveled format also has the number of travelers
+    vertices, edges = map(int, data.readline().split()[:2])
+    return _TMG_FORMATS[header[2]], vertices, edges
+
+
+def _parse_vertex_lines(lines) :
+    # vertex lines are: StringID latitude longitude
+    tokens = b" ".join(lines).split()
+    if len(tokens) != 3 * len(lines) :
+        # a StringID with spaces in it, so the lines must be split one at a time
+        tokens = [ token for line in lines for token in line.rsplit(None, 2)[-3:] ]
+    return array('d', map(float, tokens[1::3])), array('d', map(float, tokens[2::3]))
+
+
+def _parse_edge_lines(lines, first_point) :
+    if first_point is not None :
+        # edge lines are: from to label [travelers] lat lng lat lng ...
+        # with a variable number of shaping points, so they are split one
+        # at a time
+        edge_tokens = [ line.split() for line in lines ]
+        tails = array('q', [ int(tokens[0]) for tokens in edge_tokens ])
+        heads = array('q', [ int(tokens[1]) for tokens in edge_tokens ])
+        counts = array('q', [ (len(tokens) - first_point) // 2 for tokens in edge_tokens ])
+        points = [ token for tokens in edge_tokens for token in tokens[first_point:] ]
+        return tails, heads, (counts, array('d', map(float, points[0::2])), array('d', map(float, points[1::2])))
+    # edge lines are: from to label
+    tokens = b" ".join(lines).split()
+    if len(tokens) != 3 * len(lines) :
+        tokens = [ token for line in lines for token in (line.split(None, 2) + [b""])[:3] ]
+    return array('q', map(int, tokens[0::3])), array('q', map(int, tokens[1::3])), None
+
+
+def _parse_tmg_parallel(filename, workers) :
+    # the same as _parse_tmg, with the lines after the header split into
+    # ranges of bytes that end at line ends.  A pool of processes first
+    # counts the lines of each range, which tells each range which of its
+    # lines are vertex lines and which are edge lines, and then parses the
+    # ranges, each mapping the file itself.  The parts are concatenated in
+    # order, so the arrays are the same as from parsing in one process.
+    with open(filename, "rb") as my_file :
+        with mmap.mmap(my_file.fileno(), 0, access=mmap.ACCESS_READ) as data :
+            first_point, vertices, edges = _parse_tmg_header(filename, data)
+            start = data.tell()
+            size = len(data)
+            chunk = max(1, -(-(size - start) // (4 * workers)))
+            bounds = [ start ]
+            while bounds[-1] < size :
+                end = data.find(b"\n", bounds[-1] + chunk - 1)
+                bounds.append(size if end < 0 else end + 1)
+    ranges = list(zip(bounds, bounds[1:]))
+    with Pool(workers) as pool :
+        line_counts = pool.starmap(_count_lines_worker, [ (filename, lo, hi) for lo, hi in ranges ])
+        first_line = 0
+        tasks = []
+        for (lo, hi), count in zip(ranges, line_counts) :
+            if first_line >= vertices + edges :
+                break
+            tasks.append((filename, lo, hi, first_line, vertices, edges, first_point))
+            first_line += count
+        parts = pool.starmap(_parse_range_worker, tasks)
+    lat, lng, tails, heads = array('d'), array('d'), array('q'), array('q')
+    shapes = None if first_point is None else (array('q'), array('d'), array('d'))
+    for part_lat, part_lng, part_tails, part_heads, part_shapes in parts :
+        lat.extend(part_lat)
+        lng.extend(part_lng)
+        tails.extend(part_tails)
+        heads.extend(part_heads)
+        if shapes is not None :
+            for a, part in zip(shapes, part_shapes) :
+                a.extend(part)
+    return lat, lng, tails, heads, shapes
+
+
+def _range_lines(filename, lo, hi) :
+    # the lines in bytes lo to hi of a file, where hi is a line end
+    with open(filename, "rb") as my_file :
+        with mmap.mmap(my_file.fileno(), 0, access=mmap.ACCESS_READ) as data :
+            lines = data[lo:hi].split(b"\n")
+    if lines[-1] == b"" :
+        lines.pop()
+    return lines
+
+
+def _count_lines_worker(filename, lo, hi) :
+    # the number of lines that _range_lines would return
+    with open(filename, "rb") as my_file :
+        with mmap.mmap(my_file.fileno(), 0, access=mmap.ACCESS_READ) as data :
+            count = data[lo:hi].count(b"\n")
+            if hi > lo and data[hi - 1] != ord("\n") :
+                count += 1
+    return count
+
+
+def _parse_range_worker(filename, lo, hi, first_line, vertices, edges, first_point) :
+    # parses the vertex and edge lines among the lines in bytes lo to hi,
+    # which begin with line first_line after the header
+    lines = _range_lines(filename, lo, hi)
+    edges_start = min(len(lines), max(0, vertices - first_line))
+    edges_end = min(len(lines), max(0, vertices + edges - first_line))
+    lat, lng = _parse_vertex_lines(lines[:edges_start])
+    tails, heads, shapes = _parse_edge_lines(lines[edges_start:edges_end], first_point)
+    return lat, lng, tails, heads, shapes
+
+
 if __name__ == "__main__" :
     # get the file name from the arg array passed to main
     # should be index 1 as first argument
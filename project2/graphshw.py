@@ -1,13 +1,28 @@
+from array import array
 from collections import deque
+from itertools import repeat
+from multiprocessing import Pool
+import copy
+import heapq
 import math
+import os
+try :
+    import numpy as np
+except ImportError :
+    np = None
 from disjointset import DisjointIntegerSets
-from intpq import PQInts, ArrayPQInts
+from intpq import PQInts, ArrayPQInts, DaryPQInts, PairingPQInts, FibonacciPQInts, RadixPQInts, \
+    TournamentPQInts, NumpyArrayPQInts
+import pqselect
 
 class Graph :
     """Graph represented with adjacency lists."""
 
     __slots__ = ['_adj']
 
+    _weighted = False
+    _directed = False
+
     def __init__(self, v=10, edges=[]) :
         """Initializes a graph with a specified number of vertexes.
 
@@ -41,6 +56,31 @@ class Graph :
         """        
         return self._adj[vertex]._size
 
+    def freeze(self) :
+        """Returns a read-only copy of this graph whose adjacency lists are
+        stored in compressed sparse row (CSR) form: one flat array of offsets
+        indexed by vertex, and flat arrays of targets (and weights) holding
+        every adjacency list back to back.  The frozen graph supports all
+        of the query and algorithm methods, but not add_edge.
+        """
+        G = copy.copy(self)
+        G._adj = _CSRAdjacency.from_lists(self._adj, self._weighted)
+        return G
+
+    def is_frozen(self) :
+        """Returns True if this graph is a frozen (CSR) graph."""
+        return isinstance(self._adj, _CSRAdjacency)
+
+    def _reverse_adj(self) :
+        # adjacency lists of the reversed edges, which a frozen digraph
+        # keeps from when it was frozen, or None for a digraph that is not
+        # frozen, as reversing its edges would take O(V+E) time
+        if not self._directed :
+            return self._adj
+        if self.is_frozen() :
+            return self._radj
+        return None
+
     def bfs(self, s) :
         """Performs a BFS of the graph from a specified starting vertex.
         Returns a list of objects, one per vertex, containing the vertex's distance
@@ -69,6 +109,143 @@ class Graph :
                     q.append(v)
         return vertexes
 
+    def bfs_arrays(self, s, alpha=14, beta=24) :
+        """Performs a direction-optimizing BFS (Beamer, Asanovic, and Patterson, 2012)
+        of the graph from a specified starting vertex.  Returns a pair of integer
+        arrays d, pred indexed by vertex id, where d[v] is the number of edges on a
+        shortest path from s to v and pred[v] is v's predecessor in a BFS tree,
+        with -1 in both for vertexes not reachable from s.
+
+        Each level is expanded either top-down (from the frontier to its unvisited
+        neighbors) or bottom-up (each unvisited vertex looks for a neighbor in the
+        frontier), whichever is expected to inspect fewer edges.  Bottom-up steps
+        need incoming edges, so digraphs are always searched top-down.
+
+        Keyword arguments:
+        s - the integer id of the starting vertex.
+        alpha - switch to bottom-up once the edges out of the frontier exceed
+                1/alpha of the edges out of unvisited vertexes.
+        beta - switch back to top-down once the frontier holds fewer than
+               1/beta of the vertexes.
+        """
+        n = self.num_vertexes()
+        adj = self._adj
+        d = array('q', [-1]) * n
+        pred = array('q', [-1]) * n
+        d[s] = 0
+        degree = [ uList._size for uList in adj ]
+        m_u = sum(degree) - degree[s]
+        unvisited = None
+        bottom_up = False
+        frontier = [s]
+        level = 0
+        while len(frontier) > 0 :
+            level += 1
+            if not self._directed :
+                if bottom_up :
+                    bottom_up = len(frontier) >= n / beta
+                else :
+                    m_f = sum(degree[u] for u in frontier)
+                    bottom_up = m_f > m_u / alpha
+            next_frontier = []
+            if bottom_up :
+                in_frontier = bytearray(n)
+                for u in frontier :
+                    in_frontier[u] = 1
+                if unvisited is None :
+                    unvisited = range(n)
+                unvisited = [ v for v in unvisited if d[v] < 0 ]
+                for v in unvisited :
+                    for u in adj[v] :
+                        if in_frontier[u] :
+                            d[v] = level
+                            pred[v] = u
+                            next_frontier.append(v)
+                            break
+            else :
+                for u in frontier :
+                    for v in adj[u] :
+                        if d[v] < 0 :
+                            d[v] = level
+                            pred[v] = u
+                            next_frontier.append(v)
+            for v in next_frontier :
+                m_u -= degree[v]
+            frontier = next_frontier
+        return d, pred
+
+    def multi_bfs(self, sources) :
+        """Performs a BFS from each of a list of starting vertexes, all in one
+        bit-parallel sweep of the adjacency lists (MS-BFS, Then et al., 2014).
+        Returns a list with one integer array per source, in the same order as
+        sources, where d[v] is the number of edges on a shortest path from that
+        source to v, or -1 if v is not reachable from it.
+
+        Each vertex keeps a bitset (a Python int) of the searches that have
+        reached it, so an edge is inspected once per level for all of the
+        searches that share it rather than once per search.
+
+        Keyword arguments:
+        sources - list of integer ids of the starting vertexes.
+        """
+        return self._ms_bfs(sources)
+
+    def multi_bfs_iter(self, sources, batch_size=64) :
+        """Generator version of multi_bfs that runs the searches in batches of
+        batch_size sources, yielding a (source, d) pair for each source as soon
+        as its batch finishes.  See multi_bfs for the form of d.
+
+        Keyword arguments:
+        sources - iterable of integer ids of the starting vertexes.
+        batch_size - number of searches that share each sweep.
+        """
+        batch = []
+        for s in sources :
+            batch.append(s)
+            if len(batch) == batch_size :
+                yield from zip(batch, self._ms_bfs(batch))
+                batch = []
+        if len(batch) > 0 :
+            yield from zip(batch, self._ms_bfs(batch))
+
+    def _ms_bfs(self, sources) :
+        n = self.num_vertexes()
+        adj = self._adj
+        dist = [ array('q', [-1]) * n for s in sources ]
+        seen = [0] * n
+        visit = [0] * n
+        visit_next = [0] * n
+        frontier = []
+        for i, s in enumerate(sources) :
+            if visit[s] == 0 :
+                frontier.append(s)
+            seen[s] |= 1 << i
+            visit[s] |= 1 << i
+            dist[i][s] = 0
+        level = 0
+        while len(frontier) > 0 :
+            level += 1
+            next_frontier = []
+            for u in frontier :
+                searches = visit[u]
+                visit[u] = 0
+                for v in adj[u] :
+                    new = searches & ~seen[v]
+                    if new :
+                        if visit_next[v] == 0 :
+                            next_frontier.append(v)
+                        visit_next[v] |= new
+                        seen[v] |= new
+            for v in next_frontier :
+                new = visit_next[v]
+                while new :
+                    low = new & -new
+                    dist[low.bit_length() - 1][v] = level
+                    new ^= low
+            visit, visit_next = visit_next, visit
+            frontier = next_frontier
+        return dist
+
     def dfs(self, on_finish=lambda v : None) :
         """Performs a DFS of the graph.  Returns a list of objects, one per vertex, containing
         the vertex's discovery time (d), finish time (f), and predecessor in the depth first forest
@@ -88,23 +265,28 @@ class Graph :
         vertexes = [VertexData() for i in range(self.num_vertexes())]
         time = 0
 
-        def dfs_visit(u) :
-            nonlocal time
-            nonlocal vertexes
-
-            time = time + 1
-            vertexes[u].d = time
-            for v in self._adj[u] :
-                if vertexes[v].d == 0 :
-                    vertexes[v].pred = u
-                    dfs_visit(v)
-            time = time + 1
-            vertexes[u].f = time
-            on_finish(u)
-
-        for u in range(len(vertexes)) :
-            if vertexes[u].d == 0 :
-                dfs_visit(u)
+        # explicit stack of (vertex, iterator over its remaining neighbors)
+        # in place of recursive calls, so deep searches can't exceed the
+        # recursion limit
+        for r in range(len(vertexes)) :
+            if vertexes[r].d == 0 :
+                time = time + 1
+                vertexes[r].d = time
+                stack = [ (r, iter(self._adj[r])) ]
+                while len(stack) > 0 :
+                    u, neighbors = stack[-1]
+                    for v in neighbors :
+                        if vertexes[v].d == 0 :
+                            vertexes[v].pred = u
+                            time = time + 1
+                            vertexes[v].d = time
+                            stack.append((v, iter(self._adj[v])))
+                            break
+                    else :
+                        stack.pop()
+                        time = time + 1
+                        vertexes[u].f = time
+                        on_finish(u)
         return vertexes
 
     def get_edge_list(self) :
@@ -119,6 +301,9 @@ class Graph :
 class WeightedGraph(Graph) :
     """Weighted graph represented with adjacency lists."""
 
+    _weighted = True
+    _coords = None
+
     def __init__(self, v=10, edges=[], weights=[]) :
         """Initializes a weighted graph with a specified number of vertexes.
 
@@ -141,6 +326,20 @@ class WeightedGraph(Graph) :
         self._adj[a].add(b, w)
         self._adj[b].add(a, w)
 
+    def set_weight(self, a, b, w) :
+        """Changes the weight of the edge between a and b (of every such
+        edge, if there are parallel edges).  Returns True if the graph has
+        an edge between a and b and False otherwise.
+
+        Keyword arguments:
+        a - first end point
+        b - second end point
+        w - the new weight
+        """
+        found = self._adj[a].set_weight(b, w)
+        self._adj[b].set_weight(a, w)
+        return found
+
     def get_edge_list(self, with_weights=False) :
         """Returns a list of the edges of the graph
         as a list of tuples.  Default is of the form
@@ -158,33 +357,271 @@ class WeightedGraph(Graph) :
         else :
             return [ ((u,v),w) for u, uList in enumerate(self._adj) for v, w in uList.__iter__(True) if v > u]
 
+    @staticmethod
+    def from_edge_arrays(v, tails, heads, weights) :
+        """Constructs a frozen WeightedGraph (see freeze) directly from parallel
+        arrays of edge end points and weights, such as those of a parsed highway
+        graph file, without building adjacency lists first.  The result is the
+        same as freezing a WeightedGraph with the edges added in order.
+
+        Keyword arguments:
+        v - number of vertexes
+        tails - first end point of each edge
+        heads - second end point of each edge
+        weights - weight of each edge
+        """
+        G = WeightedGraph(0)
+        G._adj = _CSRAdjacency.from_edges(v, tails, heads, weights)
+        return G
+
+    def set_coordinates(self, lat, lng) :
+        """Records a latitude and longitude for every vertex, such as those
+        of the vertexes of a highway graph, for use by shortest_path.
+
+        Keyword arguments:
+        lat - sequence of latitudes indexed by vertex id
+        lng - sequence of longitudes indexed by vertex id
+        """
+        self._coords = (lat, lng)
+
+    def get_coordinates(self, vertex) :
+        """Gets the (latitude, longitude) of a vertex, or None if
+        the graph has no coordinates.
+
+        Keyword arguments:
+        vertex - the vertex id
+        """
+        if self._coords is None :
+            return None
+        return self._coords[0][vertex], self._coords[1][vertex]
+
+    def nearest_vertex(self, lat, lng) :
+        """Gets the id of the vertex nearest, by haversine distance, to a
+        latitude and longitude, such as to start a route from a given point.
+        The graph must have coordinates (see set_coordinates).
+
+        Keyword arguments:
+        lat - the latitude
+        lng - the longitude
+        """
+        if self._coords is None :
+            raise ValueError("nearest_vertex needs vertex coordinates")
+        if self.num_vertexes() == 0 :
+            return None
+        from graphfileparser import haversine_many
+        distances = haversine_many(self._coords[0], self._coords[1], lat, lng)
+        if np is not None :
+            return int(np.argmin(np.asarray(distances)))
+        return min(range(len(distances)), key=distances.__getitem__)
+
+    def shortest_path(self, s, t, method="bidirectional", heuristic=None) :
+        """Computes a shortest path from s to t, stopping as soon as it is
+        known rather than settling the entire graph.  Returns a pair d, path
+        where d is the weight of the path and path is a list of vertex ids
+        from s to t.  If t is not reachable from s, returns math.inf and
+        an empty list.
+
+        Keyword arguments:
+        s - the source vertex
+        t - the target vertex
+        method - "bidirectional" (default) for bidirectional Dijkstra, which
+                 searches forward from s and backward from t until the
+                 searches meet (on a digraph, only if it is frozen, since
+                 the backward search needs the reversed edges, and otherwise
+                 the same as "dijkstra"); "astar" for A* search guided by a lower bound
+                 on the remaining distance; or "dijkstra" for Dijkstra's
+                 algorithm that stops when t is settled.
+        heuristic - for "astar", a function of a vertex v that gives a lower
+                    bound on the weight of a path from v to t.  Defaults to
+                    the haversine distance to t, which requires the graph
+                    to have coordinates (see set_coordinates) and edge
+                    weights no smaller than haversine distances.
+        """
+        if method == "bidirectional" :
+            reverse_adj = self._reverse_adj()
+            if reverse_adj is None :
+                return self._astar(s, t, lambda v : 0)
+            return self._bidirectional_dijkstra(s, t, reverse_adj)
+        elif method == "dijkstra" :
+            return self._astar(s, t, lambda v : 0)
+        elif method == "astar" :
+            if heuristic is None :
+                if self._coords is None :
+                    raise ValueError("astar needs a heuristic or vertex coordinates")
+                from graphfileparser import haversine
+                lat, lng = self._coords
+                lat_t, lng_t = lat[t], lng[t]
+                # computed only for the vertexes that the search reaches,
+                # once each, so a query's work depends only on that region
+                bounds = {}
+
+                def heuristic(v) :
+                    if v not in bounds :
+                        bounds[v] = haversine(lat[v], lng[v], lat_t, lng_t)
+                    return bounds[v]
+            return self._astar(s, t, heuristic)
+        else :
+            raise ValueError("unknown shortest path method: " + str(method))
+
+    def _astar(self, s, t, h) :
+        # the distances and parents are kept in dicts, and the PQ is a heapq
+        # of the vertexes reached so far, with lazy deletion of stale
+        # entries, so the work is proportional to the part of the graph
+        # that is explored
+        d = { s : 0 }
+        parent = { s : None }
+        heap = [ (h(s), 0, s) ]
+        while len(heap) > 0 :
+            f, u_d, u = heapq.heappop(heap)
+            if u_d > d[u] :
+                continue
+            if u == t :
+                return u_d, _path_to(parent, t)
+            for v, w in self._adj[u].__iter__(True) :
+                v_d = u_d + w
+                if v_d < d.get(v, math.inf) :
+                    d[v] = v_d
+                    parent[v] = u
+                    heapq.heappush(heap, (v_d + h(v), v_d, v))
+        return math.inf, []
+
+    def _bidirectional_dijkstra(self, s, t, reverse_adj) :
+        if s == t :
+            return 0, [s]
+        adj = [ self._adj, reverse_adj ]
+        d = [ { s : 0 }, { t : 0 } ]
+        parent = [ { s : None }, { t : None } ]
+        # heapqs with lazy deletion, as in _astar
+        heaps = [ [(0, s)], [(0, t)] ]
+        best = math.inf
+        meet = None
+        while True :
+            # drop stale entries, so each heap's top is its frontier distance
+            for side in (0, 1) :
+                heap = heaps[side]
+                while len(heap) > 0 and heap[0][0] > d[side][heap[0][1]] :
+                    heapq.heappop(heap)
+            if len(heaps[0]) == 0 or len(heaps[1]) == 0 :
+                break
+            top = [ heaps[0][0][0], heaps[1][0][0] ]
+            # no path through an unsettled vertex can beat the best so far
+            if top[0] + top[1] >= best :
+                break
+            # expand the search with the smaller frontier distance
+            side = 0 if top[0] <= top[1] else 1
+            d_this, d_other = d[side], d[1 - side]
+            u_d, u = heapq.heappop(heaps[side])
+            for v, w in adj[side][u].__iter__(True) :
+                v_d = u_d + w
+                if v_d < d_this.get(v, math.inf) :
+                    d_this[v] = v_d
+                    parent[side][v] = u
+                    heapq.heappush(heaps[side], (v_d, v))
+                if v in d_other and v_d + d_other[v] < best :
+                    best = v_d + d_other[v]
+                    meet = v
+        if meet is None :
+            return math.inf, []
+        path = _path_to(parent[0], meet)
+        v = parent[1][meet]
+        while v is not None :
+            path.append(v)
+            v = parent[1][v]
+        return best, path
+
     def mst_kruskal(self) :
         """Returns the set of edges in some
         minimum spanning tree (MST) of the graph,
         computed using Kruskal's algorithm.
         """
-        
+        # edges are kept in flat arrays and sorted by an argsort of the weights
         A = set()
-        forest = DisjointIntegerSets(self.num_vertexes())
-        edges = self.get_edge_list(True)
-        edges.sort(key=lambda x : x[1])
-        for (u,v), w in edges :
-            if forest.findset(u) != forest.findset(v) :
-                A.add((u,v))
-                forest.union(u,v)
+        tails, heads, weights = self._edge_arrays()
+        if np is not None :
+            order = np.argsort(np.asarray(weights), kind='stable').tolist()
+        else :
+            order = sorted(range(len(weights)), key=weights.__getitem__)
+        sets = DisjointIntegerSets(self.num_vertexes())
+        for i in order :
+            if sets.union(tails[i], heads[i]) :
+                A.add((tails[i], heads[i]))
         return A
 
-    def mst_prim(self, r=0) :
+    def mst_boruvka(self, processes=None, min_parallel_edges=1000000) :
+        """Returns the set of edges in some
+        minimum spanning tree (MST) of the graph,
+        computed using Boruvka's algorithm.
+
+        Each round, every component of the forest so far adds its cheapest
+        edge to another component.  The search for the cheapest edges is split
+        into one chunk of the edge list per process of a pool, each of which
+        is sent the edge list once, when the pool starts, and the component
+        labels once per round.
+
+        Keyword arguments:
+        processes - Number of worker processes (default is the number of CPUs).
+        min_parallel_edges - Searches serially in this process when the
+                             graph has fewer edges than this.
+        """
+        n = self.num_vertexes()
+        tails, heads, weights = self._edge_arrays()
+        m = len(tails)
+        if processes == 1 or m < min_parallel_edges :
+            return _boruvka(n, tails, heads, weights,
+                            lambda labels : _cheapest_edges(tails, heads, weights, labels, 0, m))
+        if processes is None :
+            processes = os.cpu_count() or 1
+        chunk = max(1, -(-m // processes))
+        bounds = [ (lo, min(lo + chunk, m)) for lo in range(0, m, chunk) ]
+        with Pool(processes, initializer=_init_worker_edges, initargs=(tails, heads, weights)) as pool :
+            def cheapest(labels) :
+                best = {}
+                for part in pool.starmap(_cheapest_edges_worker, [ (labels, lo, hi) for lo, hi in bounds ]) :
+                    for c, e in part.items() :
+                        if c not in best or e < best[c] :
+                            best[c] = e
+                return best
+            return _boruvka(n, tails, heads, weights, cheapest)
+
+    def _edge_arrays(self) :
+        # the edges of get_edge_list(True) as parallel flat arrays of
+        # end points and weights
+        tails = array('q')
+        heads = array('q')
+        weights = []
+        for u, uList in enumerate(self._adj) :
+            for v, w in uList.__iter__(True) :
+                if v > u :
+                    tails.append(u)
+                    heads.append(v)
+                    weights.append(w)
+        return tails, heads, _CSRAdjacency._weight_array(weights)
+
+    def mst_prim(self, r=0, lazy=False, pq=None, report=False) :
         """Returns the set of edges in some
         minimum spanning tree (MST) of the graph,
         computed using Prim's algorithm.
 
         Keyword arguments:
         r - vertex id to designate as the root (default is 0).
+        lazy - if True, vertexes are added to the priority queue only
+               when first reached rather than all at once at the start.
+        pq - an empty priority queue to use, configured for the number
+             of vertexes, or the name of one of pqselect.BACKENDS.  By
+             default, the one the pqselect cost model predicts is fastest
+             for the size of the graph.
+        report - if True, returns a pair: the set of edges, and the name
+                 of the backend (or class of pq) that was used.
         """
+        pq, backend = self._select_pq(pq, False)
+        if self.num_vertexes() == 0 :
+            return (set(), backend) if report else set()
+        if lazy :
+            edges = self._mst_prim_lazy(r, pq)
+            return (edges, backend) if report else edges
 
         parent = [ None for x in range(self.num_vertexes())]
-        Q = PQInts(self.num_vertexes())
+        Q = pq
         Q.insert(r, 0)
         for u in range(self.num_vertexes()) :
             if u != r :
@@ -195,7 +632,66 @@ class WeightedGraph(Graph) :
                 if Q.contains(v) and w < Q.get_priority(v) :
                     parent[v] = u
                     Q.change_priority(v, w)
-        return { (u,v) for v, u in enumerate(parent) if u != None}
+        edges = { (u,v) for v, u in enumerate(parent) if u != None}
+        return (edges, backend) if report else edges
+
+    def _select_pq(self, pq, monotone) :
+        # the PQ to use, and its name, for a pq argument that is either a
+        # PQ, a backend name, or None to choose by the cost model
+        if pq is None :
+            integer = monotone and self._integer_weights()
+            pq = pqselect.choose_pq(self.num_vertexes(), sum(uList._size for uList in self._adj), integer)
+        if isinstance(pq, str) :
+            return pqselect.make_pq(pq, self.num_vertexes()), pq
+        return pq, type(pq).__name__
+
+    def _integer_weights(self) :
+        # True if all edge weights are nonnegative integers
+        if self.is_frozen() and self._adj._weights is not None :
+            weights = self._adj._weights
+            return weights.typecode == 'q' and (len(weights) == 0 or min(weights) >= 0)
+        return all(type(w) is int and w >= 0 for uList in self._adj for v, w in uList.__iter__(True))
+
+    def _mst_prim_lazy(self, r, Q) :
+        n = self.num_vertexes()
+        parent = {}
+        key = {}
+        in_tree = bytearray(n)
+        # every vertex below this one is in a tree already
+        cursor = 0
+        while r >= 0 :
+            key[r] = 0
+            Q.insert(r, 0)
+            while not Q.is_empty() :
+                u = Q.extract_min()
+                in_tree[u] = 1
+                for v, w in self._adj[u].__iter__(True) :
+                    if not in_tree[v] and w < key.get(v, math.inf) :
+                        key[v] = w
+                        parent[v] = u
+                        if Q.contains(v) :
+                            Q.change_priority(v, w)
+                        else :
+                            Q.insert(v, w)
+            # continue with the next component, if any, for a spanning forest
+            r = cursor = in_tree.find(0, cursor)
+        return { (u,v) for v, u in parent.items() }
+
+    def dijkstra(self, s, pq=None, report=False):
+        """Dijkstra's Algorithm, by default with the priority queue that the
+        pqselect cost model predicts is fastest for the number of vertexes
+        and edges of the graph, and whether its weights are integers.
+
+        Keyword Arguments:
+        s - The source vertex.
+        pq - The name of one of pqselect.BACKENDS to use instead, or an
+             empty priority queue configured for the number of vertexes.
+        report - If True, returns a pair: the results, and the name of the
+                 backend (or class of pq) that was used.
+        """
+        pq, backend = self._select_pq(pq, True)
+        paths = self._dijkstra(s, pq)
+        return (paths, backend) if report else paths
 
     def dijkstra_binheap(self, s):
         """Dijkstra's Algorithm using a binary heap as the PQ.
@@ -223,14 +719,116 @@ class WeightedGraph(Graph) :
         #   implemented with a simple array for its priority queue.
         return self._dijkstra(s, ArrayPQInts(self.num_vertexes()))
 
-    def _dijkstra(self, s, pq):
+    def dijkstra_tournament(self, s):
+        """Dijkstra's Algorithm using an array with a tournament tree
+        over it as the PQ.
+
+        Keyword Arguments:
+        s - The source vertex.
+        """
+        return self._dijkstra(s, TournamentPQInts(self.num_vertexes()))
+
+    def dijkstra_numpy(self, s):
+        """Dijkstra's Algorithm using a NumPy array as the PQ.
+        Requires NumPy.
+
+        Keyword Arguments:
+        s - The source vertex.
+        """
+        return self._dijkstra(s, NumpyArrayPQInts(self.num_vertexes()))
+
+    def dijkstra_radix(self, s):
+        """Dijkstra's Algorithm using a radix heap as the PQ.
+        The edge weights must be nonnegative integers.
+
+        Keyword Arguments:
+        s - The source vertex.
+        """
+        return self._dijkstra(s, RadixPQInts(self.num_vertexes()))
+
+    def dijkstra_dary(self, s, d=4):
+        """Dijkstra's Algorithm using a d-ary heap as the PQ.
+
+        Keyword Arguments:
+        s - The source vertex.
+        d - The number of children of each node of the heap.
+        """
+        return self._dijkstra(s, DaryPQInts(self.num_vertexes(), d))
+
+    def dijkstra_pairing(self, s):
+        """Dijkstra's Algorithm using a pairing heap as the PQ.
+
+        Keyword Arguments:
+        s - The source vertex.
+        """
+        return self._dijkstra(s, PairingPQInts(self.num_vertexes()))
+
+    def dijkstra_fibonacci(self, s):
+        """Dijkstra's Algorithm using a Fibonacci heap as the PQ.
+
+        Keyword Arguments:
+        s - The source vertex.
+        """
+        return self._dijkstra(s, FibonacciPQInts(self.num_vertexes()))
+
+    def dijkstra_many(self, sources, processes=None, min_parallel_work=1000000):
+        """Dijkstra's Algorithm (binary heap PQ) from each of several sources,
+        spread across a pool of processes.  Generates a (s, paths) pair for each
+        source s, in the order of sources, where paths is what dijkstra_binheap(s)
+        returns.  Results are generated as they arrive from the workers.
+
+        The graph is frozen (see freeze) and sent to each worker process once,
+        when the pool starts, rather than with every task.
+
+        Keyword Arguments:
+        sources - Iterable of source vertexes.
+        processes - Number of worker processes (default is the number of CPUs).
+        min_parallel_work - Runs serially in this process when the number of
+                            sources times the size of the graph is below this.
+        """
+        sources = list(sources)
+        work = len(sources) * (self.num_vertexes() + sum(uList._size for uList in self._adj))
+        if processes == 1 or len(sources) < 2 or work < min_parallel_work :
+            for s in sources :
+                yield s, self.dijkstra_binheap(s)
+            return
+        if processes is None :
+            processes = os.cpu_count() or 1
+        G = self if self.is_frozen() else self.freeze()
+        chunksize = max(1, len(sources) // (4 * processes))
+        with Pool(processes, initializer=_init_worker_graph, initargs=(G,)) as pool :
+            yield from pool.imap(_dijkstra_worker, sources, chunksize)
+
+    def dijkstra_lazy(self, s, bound=math.inf, targets=None):
+        """Dijkstra's Algorithm using a heapq with lazy deletion as the PQ,
+        adding vertexes to it only when they are first reached.  Returns
+        (vertex, d, parent) 3-tuples only for the vertexes that are settled,
+        in the order settled.  Nothing is sized by the number of vertexes,
+        so the work is proportional to the part of the graph that is explored.
+
+        Keyword Arguments:
+        s - The source vertex.
+        bound - Stop before settling any vertex farther than bound from s.
+        targets - Iterable of vertexes; stop once all of them are settled.
+        """
+        return self._dijkstra_lazy(s, bound, targets)
+
+    def _dijkstra(self, s, pq, lazy=False, bound=math.inf, targets=None):
         """Dijkstra's Algorithm using a priority queue
         provided as a parameter.
 
         Keyword Arguments:
         s - The source vertex.
         pq - The priority queue to use.
+        lazy - If True, search as dijkstra_lazy does, returning results only
+               for the settled vertexes; pq is not used.
+        bound - Stop before settling any vertex farther than bound from s.
+                Implies lazy.
+        targets - Iterable of vertexes; stop once all of them are settled.
+                  Implies lazy.
         """
+        if lazy or bound != math.inf or targets is not None :
+            return self._dijkstra_lazy(s, bound, targets)
 
         # Programming Assignment 3:
         # 1) Implement Dijkstra's Algorithm. This method has been named
@@ -340,10 +938,39 @@ class WeightedGraph(Graph) :
         # return the result
         return final_shortest_paths
 
+    def _dijkstra_lazy(self, s, bound, targets) :
+        # as in _astar, the distances and parents are kept in dicts and the
+        # PQ is a heapq with lazy deletion of stale entries
+        d = { s : 0 }
+        parent = { s : None }
+        remaining = None if targets is None else set(targets)
+        results = []
+        heap = [ (0, s) ]
+        while len(heap) > 0 :
+            u_d, u = heapq.heappop(heap)
+            if u_d > d[u] :
+                continue
+            if u_d > bound :
+                break
+            results.append((u, u_d, parent[u]))
+            if remaining is not None :
+                remaining.discard(u)
+                if len(remaining) == 0 :
+                    break
+            for v, w in self._adj[u].__iter__(True) :
+                v_d = u_d + w
+                if v_d < d.get(v, math.inf) :
+                    d[v] = v_d
+                    parent[v] = u
+                    heapq.heappush(heap, (v_d, v))
+        return results
+
 class Digraph(Graph) :
     """Digraph represented with adjacency lists."""
 
-    __slots__ = [ '_indegree' ]
+    __slots__ = [ '_indegree', '_radj' ]
+
+    _directed = True
 
     def __init__(self, v=10, edges=[]) :
         self._indegree = [ 0 for i in range(v) ]
@@ -390,14 +1017,34 @@ class Digraph(Graph) :
         """
         return [ (u,v) for u, uList in enumerate(self._adj) for v in uList]
 
+    def freeze(self) :
+        """Returns a read-only copy of this digraph whose adjacency lists are
+        stored in compressed sparse row (CSR) form.  See Graph.freeze.
+        The frozen digraph also keeps the CSR form of its reversed edges,
+        for searches that follow edges backward, such as shortest_path.
+        """
+        G = super().freeze()
+        G._indegree = G._adj.in_degrees()
+        G._radj = G._adj.transpose()
+        return G
+
     def transpose(self) :
-        """Generates and returns the transpose of this Digraph."""
+        """Generates and returns the transpose of this Digraph.
+        The transpose of a frozen digraph is also frozen."""
+        if self.is_frozen() :
+            return self._frozen_transpose()
         T = Digraph(self.num_vertexes())
         for u, adjacent in enumerate(self._adj) :
             for v in adjacent :
                 T.add_edge(v, u)
         return T
 
+    def _frozen_transpose(self) :
+        T = copy.copy(self)
+        T._adj, T._radj = self._radj, self._adj
+        T._indegree = self._adj.out_degrees()
+        return T
+
     def topological_sort(self) :
         """Topological Sort of the directed graph (Section 22.4 from textbook).
         Returns the topological sort as a list of vertex indices.
@@ -410,32 +1057,98 @@ class Digraph(Graph) :
         top_sort.reverse()
         return top_sort
 
-    def scc(self) :
+    def scc(self, method="kosaraju") :
         """Computes the strongly connected components of a digraph.
         Returns a list of sets, containing one set for each
         strongly connected component,
-        which is simply a set of the vertexes in that component."""
+        which is simply a set of the vertexes in that component.
+        The components are listed in topological order of the
+        component graph.
+
+        Keyword arguments:
+        method - "kosaraju" (default) for the two pass algorithm from the
+                 textbook, which searches the transpose of the digraph, or
+                 "pearce" for Pearce's single pass variant of Tarjan's
+                 algorithm, which never builds the transpose.
+        """
+        if method == "pearce" :
+            return self._scc_pearce()
+        elif method != "kosaraju" :
+            raise ValueError("unknown scc method: " + str(method))
         ordered = self.topological_sort()
         T = self.transpose()
         
         discovered = [ False for i in range(T.num_vertexes())]
-        def dfs_visit(u, component) :
-            nonlocal discovered
-            nonlocal T
-
-            discovered[u] = True
-            component.add(u)
-            for v in T._adj[u] :
-                if not discovered[v] :
-                    dfs_visit(v, component)
 
         SCC = []
         for u in ordered :
             if not discovered[u] :
                 component = set()
-                dfs_visit(u, component)
+                discovered[u] = True
+                stack = [u]
+                while len(stack) > 0 :
+                    x = stack.pop()
+                    component.add(x)
+                    for v in T._adj[x] :
+                        if not discovered[v] :
+                            discovered[v] = True
+                            stack.append(v)
                 SCC.append(component)
         return SCC
+
+    def _scc_pearce(self) :
+        # Pearce, "A space-efficient algorithm for finding strongly connected
+        # components" (2016).  rindex[v] is v's discovery index while v is
+        # on the search path, and becomes its component id (counting down
+        # from n-1) once its component is complete.
+        n = self.num_vertexes()
+        rindex = [ 0 for i in range(n) ]
+        root = bytearray(n)
+        S = []
+        index = 1
+        c = n - 1
+        for r in range(n) :
+            if rindex[r] != 0 :
+                continue
+            rindex[r] = index
+            index += 1
+            root[r] = 1
+            stack = [ (r, iter(self._adj[r])) ]
+            while len(stack) > 0 :
+                v, neighbors = stack[-1]
+                for w in neighbors :
+                    if rindex[w] == 0 :
+                        rindex[w] = index
+                        index += 1
+                        root[w] = 1
+                        stack.append((w, iter(self._adj[w])))
+                        break
+                    if rindex[w] < rindex[v] :
+                        rindex[v] = rindex[w]
+                        root[v] = 0
+                else :
+                    stack.pop()
+                    if root[v] :
+                        index -= 1
+                        while len(S) > 0 and rindex[v] <= rindex[S[-1]] :
+                            w = S.pop()
+                            rindex[w] = c
+                            index -= 1
+                        rindex[v] = c
+                        c -= 1
+                    else :
+                        S.append(v)
+                    if len(stack) > 0 :
+                        u = stack[-1][0]
+                        if rindex[v] < rindex[u] :
+                            rindex[u] = rindex[v]
+                            root[u] = 0
+        # components are completed in reverse topological order, so the
+        # smallest component id is the first in topological order
+        SCC = [ set() for i in range(n - 1 - c) ]
+        for v in range(n) :
+            SCC[rindex[v] - c - 1].add(v)
+        return SCC
         
 
 class WeightedDigraph(WeightedGraph,Digraph) :
@@ -462,6 +1175,18 @@ class WeightedDigraph(WeightedGraph,Digraph) :
         """
         self._adj[a].add(b, w)
 
+    def set_weight(self, a, b, w) :
+        """Changes the weight of the edge from a to b (of every such
+        edge, if there are parallel edges).  Returns True if the graph has
+        an edge from a to b and False otherwise.
+
+        Keyword arguments:
+        a - source (starting) vertex
+        b - target (ending) vertex
+        w - the new weight
+        """
+        return self._adj[a].set_weight(b, w)
+
     def degree(self, vertex) :
         return Digraph.degree(self, vertex)
 
@@ -483,7 +1208,10 @@ class WeightedDigraph(WeightedGraph,Digraph) :
             return [ ((u,v),w) for u, uList in enumerate(self._adj) for v, w in uList.__iter__(True)]
      
     def transpose(self) :
-        """Generates and returns the transpose of this Digraph."""
+        """Generates and returns the transpose of this Digraph.
+        The transpose of a frozen digraph is also frozen."""
+        if self.is_frozen() :
+            return self._frozen_transpose()
         T = WeightedDigraph(self.num_vertexes())
         for u, adjacent in enumerate(self._adj) :
             for v, w in adjacent.__iter__(True) :
@@ -491,6 +1219,78 @@ class WeightedDigraph(WeightedGraph,Digraph) :
         return T
 
 
+# graph shared by the tasks of a worker process, set once when the
+# worker starts so that it isn't pickled with every task
+_worker_graph = None
+
+def _init_worker_graph(G) :
+    global _worker_graph
+    _worker_graph = G
+
+def _dijkstra_worker(s) :
+    return s, _worker_graph.dijkstra_binheap(s)
+
+# edge list shared by the tasks of a worker process
+_worker_edges = None
+
+def _init_worker_edges(tails, heads, weights) :
+    global _worker_edges
+    _worker_edges = (tails, heads, weights)
+
+def _cheapest_edges_worker(labels, lo, hi) :
+    return _cheapest_edges(*_worker_edges, labels, lo, hi)
+
+def _cheapest_edges(tails, heads, weights, labels, lo, hi) :
+    # cheapest edge (as a (weight, index) pair, so ties are broken consistently)
+    # out of each component, among the edges with index in [lo, hi)
+    best = {}
+    for i in range(lo, hi) :
+        a = labels[tails[i]]
+        b = labels[heads[i]]
+        if a != b :
+            e = (weights[i], i)
+            if a not in best or e < best[a] :
+                best[a] = e
+            if b not in best or e < best[b] :
+                best[b] = e
+    return best
+
+def _boruvka(n, tails, heads, weights, cheapest) :
+    # Boruvka's algorithm, given a function that finds the cheapest edge out
+    # of each component given the component label of each vertex
+    A = set()
+    labels = array('q', range(n))
+    while True :
+        best = cheapest(labels)
+        if len(best) == 0 :
+            return A
+        for w, i in best.values() :
+            u = labels[tails[i]]
+            while labels[u] != u :
+                u = labels[u]
+            v = labels[heads[i]]
+            while labels[v] != v :
+                v = labels[v]
+            if u != v :
+                A.add((tails[i], heads[i]))
+                labels[u] = v
+        # relabel every vertex by the root of its component
+        for x in range(n) :
+            root = labels[x]
+            while labels[root] != root :
+                root = labels[root]
+            labels[x] = root
+
+def _path_to(parent, v) :
+    # follows parent links back from v, returning the path that ends at v
+    path = []
+    while v is not None :
+        path.append(v)
+        v = parent[v]
+    path.reverse()
+    return path
+
+
 class _AdjacencyList :
 
     __slots__ = [ '_first', '_last', '_size']
@@ -523,6 +1323,16 @@ class _WeightedAdjacencyList(_AdjacencyList) :
     def add(self, vertex, w=1) :
         self._add(_WeightedAdjListNode(vertex, w))
 
+    def set_weight(self, vertex, w) :
+        found = False
+        node = self._first
+        while node != None :
+            if node._targetVertex == vertex :
+                node._w = w
+                found = True
+            node = node._next
+        return found
+
     def __iter__(self, weighted=False):
         if weighted :
             return _AdjListIterWithWeights(self)
@@ -578,6 +1388,175 @@ class _AdjListIterWithWeights(_AdjListIter) :
         return vertex, w
 
 
+class _CSRAdjacency :
+    """Adjacency lists of a frozen graph in compressed sparse row form.
+    The neighbors of vertex u are _targets[_offsets[u]:_offsets[u+1]], with
+    the corresponding edge weights at the same positions of _weights (None
+    for an unweighted graph)."""
+
+    __slots__ = [ '_offsets', '_targets', '_weights', '_tview', '_wview' ]
+
+    def __init__(self, offsets, targets, weights=None) :
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+        self._tview = memoryview(targets)
+        self._wview = None if weights is None else memoryview(weights)
+
+    @staticmethod
+    def from_lists(adj, weighted=False) :
+        """Builds the CSR form of a list of adjacency lists, keeping
+        the order of each adjacency list."""
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = [] if weighted else None
+        for uList in adj :
+            if weighted :
+                for v, w in uList.__iter__(True) :
+                    targets.append(v)
+                    weights.append(w)
+            else :
+                targets.extend(uList)
+            offsets.append(len(targets))
+        return _CSRAdjacency(offsets, targets, _CSRAdjacency._weight_array(weights))
+
+    @staticmethod
+    def from_edges(n, tails, heads, weights=None, directed=False) :
+        """Builds the CSR form directly from parallel arrays of edge end points
+        (and weights), with a counting sort rather than intermediate lists.  Each
+        adjacency list has the same order that calling add_edge once per edge
+        would produce."""
+        if np is not None and (weights is None or isinstance(weights, array)) :
+            return _CSRAdjacency._from_edges_numpy(n, tails, heads, weights, directed)
+        counts = array('q', bytes(8 * (n + 1)))
+        for u in tails :
+            counts[u + 1] += 1
+        if not directed :
+            for v in heads :
+                counts[v + 1] += 1
+        for u in range(n) :
+            counts[u + 1] += counts[u]
+        offsets = array('q', counts)
+        m = offsets[n]
+        targets = array('q', bytes(8 * m))
+        w_out = None
+        if weights is not None :
+            w_out = [None] * m
+        if directed :
+            for i, u in enumerate(tails) :
+                pos = counts[u]
+                counts[u] = pos + 1
+                targets[pos] = heads[i]
+                if w_out is not None :
+                    w_out[pos] = weights[i]
+        else :
+            for i, u in enumerate(tails) :
+                v = heads[i]
+                pos = counts[u]
+                counts[u] = pos + 1
+                targets[pos] = v
+                pos_v = counts[v]
+                counts[v] = pos_v + 1
+                targets[pos_v] = u
+                if w_out is not None :
+                    w_out[pos] = w_out[pos_v] = weights[i]
+        return _CSRAdjacency(offsets, targets, _CSRAdjacency._weight_array(w_out))
+
+    @staticmethod
+    def _from_edges_numpy(n, tails, heads, weights, directed) :
+        # the same counting sort, as a stable argsort of the adjacency list
+        # entries by source, where an undirected edge i is entries 2i and 2i+1
+        tails = np.asarray(tails, dtype=np.int64)
+        heads = np.asarray(heads, dtype=np.int64)
+        if directed :
+            sources, targets = tails, heads
+        else :
+            sources = np.empty(2 * len(tails), dtype=np.int64)
+            sources[0::2] = tails
+            sources[1::2] = heads
+            targets = np.empty_like(sources)
+            targets[0::2] = heads
+            targets[1::2] = tails
+        order = np.argsort(sources, kind='stable')
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+        w_out = None
+        if weights is not None :
+            w = np.asarray(weights)
+            if not directed :
+                w = np.repeat(w, 2)
+            w_out = array(weights.typecode, w[order].tobytes())
+        return _CSRAdjacency(array('q', offsets.tobytes()), array('q', targets[order].tobytes()), w_out)
+
+    @staticmethod
+    def _weight_array(weights) :
+        # integer weights stay integers; anything else is stored as doubles
+        if weights is None :
+            return None
+        if all(type(w) is int for w in weights) :
+            return array('q', weights)
+        return array('d', weights)
+
+    def __reduce__(self) :
+        return (_CSRAdjacency, (self._offsets, self._targets, self._weights))
+
+    def __len__(self) :
+        return len(self._offsets) - 1
+
+    def __getitem__(self, u) :
+        lo = self._offsets[u]
+        hi = self._offsets[u + 1]
+        return _CSRRow(self._tview[lo:hi], None if self._wview is None else self._wview[lo:hi])
 
+    def __iter__(self) :
+        for u in range(len(self)) :
+            yield self[u]
 
-    
+    def out_degrees(self) :
+        """List of the lengths of the adjacency lists."""
+        offsets = self._offsets
+        return [ offsets[u+1] - offsets[u] for u in range(len(self)) ]
+
+    def in_degrees(self) :
+        """List of the number of times each vertex appears as a target."""
+        indegree = [ 0 for i in range(len(self)) ]
+        for v in self._targets :
+            indegree[v] += 1
+        return indegree
+
+    def transpose(self) :
+        """Returns the CSR form of the reversed edges."""
+        n = len(self)
+        offsets = self._offsets
+        if np is not None :
+            tails = np.repeat(np.arange(n, dtype=np.int64), np.diff(np.asarray(offsets)))
+            return _CSRAdjacency.from_edges(n, self._targets, tails, self._weights, True)
+        tails = array('q', bytes(8 * len(self._targets)))
+        for u in range(n) :
+            for i in range(offsets[u], offsets[u+1]) :
+                tails[i] = u
+        return _CSRAdjacency.from_edges(n, self._targets, tails, self._weights, True)
+
+class _CSRRow :
+    """View of one adjacency list of a _CSRAdjacency."""
+
+    __slots__ = [ '_targets', '_weights', '_size' ]
+
+    def __init__(self, targets, weights) :
+        self._targets = targets
+        self._weights = weights
+        self._size = len(targets)
+
+    def add(self, vertex, w=1) :
+        raise TypeError("cannot add edges to a frozen graph")
+
+    def set_weight(self, vertex, w) :
+        raise TypeError("cannot change the edges of a frozen graph")
+
+    def __iter__(self, weighted=False) :
+        if not weighted :
+            return iter(self._targets)
+        elif self._weights is None :
+            return zip(self._targets, repeat(1))
+        else :
+            return zip(self._targets, self._weights)
@@ -6,6 +6,14 @@
 # of enrollment only.  All other use prohibited.
 # Redistribution is prohibited.
 
+from itertools import compress
+import heapq
+import math
+try :
+    import numpy as np
+except ImportError :
+    np = None
+
 class PQInts :
 
     __slots__ = [ '_minheap', '_index' ]
@@ -13,7 +21,7 @@ class PQInts :
     def __init__(self, n) :
         """Initializes an empty PQ, but configured to support
         integers in the interval [0,n) as the elements."""
-        self._index = [ -1 for x in range(n) ]
+        self._index = [ -1 ] * n
         self._minheap = []
 
     def size(self) :
@@ -116,6 +124,50 @@ class PQInts :
             self._percolate_down(position)
         return True
 
+    def change_priorities(self, pairs) :
+        """Changes the priorities of many elements in the PQ.
+
+        Changes the priority of each element of the list pairs that is in the PQ,
+        ignoring those that are not.  If the list is large relative to the PQ, the
+        new priorities are all stored first and the heap is then rebuilt once,
+        rather than percolating each element separately.
+
+        Returns the number of pairs whose element is in the PQ.
+
+        Keyword arguments:
+        pairs -- A list of 2-tuples of the form (element, value) where value is the new priority of element.
+        """
+        heap = self._minheap
+        if len(pairs) * max(1, len(heap).bit_length()) < len(heap) :
+            return sum(1 for el, val in pairs if self.change_priority(el, val))
+        count = 0
+        for el, val in pairs :
+            position = self._index[el]
+            if position >= 0 :
+                heap[position] = (el, val)
+                count += 1
+        self._heapify()
+        return count
+
+    def extract_k_min(self, k) :
+        """Removes and returns a list of the k elements with minimum priority values,
+        in order of priority, or all of the elements if the PQ has fewer than k.
+
+        Keyword arguments:
+        k -- The number of elements to remove.
+        """
+        return [ self.extract_min() for i in range(min(k, len(self._minheap))) ]
+
+    def merge(self, other) :
+        """Adds all of the elements of another PQInts to this PQ, with their
+        priorities in the other PQ.  Elements already in this PQ are not changed,
+        and the other PQ is not changed.
+
+        Keyword arguments:
+        other -- A PQInts configured for no more elements than this PQ.
+        """
+        self.insert_all(list(other._minheap))
+
     def _left(i) :
         return 2*i+1
 
@@ -280,3 +332,1141 @@ class ArrayPQInts :
             self._priority[element] = value
             return True
         return False
+
+    def change_priorities(self, pairs) :
+        """Changes the priorities of many elements in the PQ.
+
+        Changes the priority of each element of the list pairs that is in the PQ,
+        ignoring those that are not.
+
+        Returns the number of pairs whose element is in the PQ.
+
+        Keyword arguments:
+        pairs -- A list of 2-tuples of the form (element, value) where value is the new priority of element.
+        """
+        count = 0
+        for el, val in pairs :
+            if self._in[el] :
+                self._priority[el] = val
+                count += 1
+        return count
+
+    def extract_k_min(self, k) :
+        """Removes and returns a list of the k elements with minimum priority values,
+        in order of priority, or all of the elements if the PQ has fewer than k.
+        Finds all k with one pass over the array, rather than one pass per element.
+
+        Keyword arguments:
+        k -- The number of elements to remove.
+        """
+        smallest = heapq.nsmallest(k, compress(range(len(self._in)), self._in), key=self._priority.__getitem__)
+        for element in smallest :
+            self._in[element] = False
+        self._size -= len(smallest)
+        return smallest
+
+    def merge(self, other) :
+        """Adds all of the elements of another ArrayPQInts to this PQ, with their
+        priorities in the other PQ.  Elements already in this PQ are not changed,
+        and the other PQ is not changed.
+
+        Keyword arguments:
+        other -- An ArrayPQInts configured for no more elements than this PQ.
+        """
+        for element in compress(range(len(other._in)), other._in) :
+            self.insert(element, other._priority[element])
+
+class DaryPQInts :
+    """Indexed d-ary min heap of integers in the interval [0,n), with the same
+    methods as PQInts.  The heap is kept in two parallel flat lists, one of
+    elements and one of their priorities, so no tuples are created, and the
+    arity d trades shallower heaps against more children to compare."""
+
+    __slots__ = [ '_elements', '_priorities', '_index', '_d' ]
+
+    def __init__(self, n, d=4) :
+        """Initializes an empty PQ, but configured to support
+        integers in the interval [0,n) as the elements.
+
+        Keyword arguments:
+        n -- number of possible elements.
+        d -- number of children of each node of the heap (e.g., 2, 4, or 8).
+        """
+        self._index = [ -1 ] * n
+        self._elements = []
+        self._priorities = []
+        self._d = d
+
+    def size(self) :
+        """Size of the PQ."""
+        return len(self._elements)
+
+    def is_empty(self) :
+        """Returns True if PQ is empty and False otherwise."""
+        return len(self._elements) == 0
+
+    def insert(self, element, value) :
+        """Adds an element to the PQ with a specified priority.
+
+        Adds the element to the PQ provided PQ doesn't already contain it.
+        Does nothing if the PQ already contains the element.
+
+        Returns True if element added and False if already present.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The priority of the element.
+        """
+        if self._index[element] >= 0 :
+            return False
+        self._elements.append(element)
+        self._priorities.append(value)
+        self._percolate_up(len(self._elements) - 1, element, value)
+        return True
+
+    def insert_all(self, pairs) :
+        """Adds a list of (element, value) pairs to the PQ.
+
+        Adds the (element, value) pairs from the list pairs to the PQ.  Only the
+        pairs for which element is not already in the PQ are added.
+
+        Keyword arguments:
+        pairs -- A list of 2-tuples of the form (element, value) where value is the priority of element.
+        """
+        if len(pairs) >= len(self._elements) :
+            for el, val in pairs :
+                if self._index[el] < 0 :
+                    self._index[el] = len(self._elements)
+                    self._elements.append(el)
+                    self._priorities.append(val)
+            self._heapify()
+        else :
+            for el, val in pairs :
+                self.insert(el, val)
+
+    def peek_min(self) :
+        """Returns, but does not remove, the element with the minimum priority value."""
+        return self._elements[0]
+
+    def extract_min(self) :
+        """Removes and returns the element with minimum priority value."""
+        min_element = self._elements[0]
+        last = self._elements.pop()
+        last_value = self._priorities.pop()
+        if len(self._elements) > 0 :
+            self._percolate_down(0, last, last_value)
+        self._index[min_element] = -1
+        return min_element
+
+    def contains(self, element) :
+        """Returns True if element is in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._index[element] >= 0
+
+    def get_priority(self, element) :
+        """Gets the current priority of the specified element.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._priorities[self._index[element]]
+
+    def change_priority(self, element, value) :
+        """Changes the priority of an element in the PQ.
+
+        Changes the priority of an element that is in the PQ.
+        Does nothing if the PQ doesn't contains the element.
+
+        Returns True if element is present in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The new priority for the element.
+        """
+        position = self._index[element]
+        if position < 0 :
+            return False
+        if self._priorities[position] > value :
+            self._percolate_up(position, element, value)
+        elif self._priorities[position] < value :
+            self._percolate_down(position, element, value)
+        return True
+
+    def _heapify(self) :
+        elements = self._elements
+        priorities = self._priorities
+        for i in range((len(elements) - 2) // self._d, -1, -1) :
+            self._percolate_down(i, elements[i], priorities[i])
+
+    def _percolate_up(self, position, element, value) :
+        # moves the hole at position up until value fits, then fills it
+        elements = self._elements
+        priorities = self._priorities
+        index = self._index
+        d = self._d
+        while position > 0 :
+            p = (position - 1) // d
+            if priorities[p] <= value :
+                break
+            moved = elements[p]
+            elements[position] = moved
+            priorities[position] = priorities[p]
+            index[moved] = position
+            position = p
+        elements[position] = element
+        priorities[position] = value
+        index[element] = position
+
+    def _percolate_down(self, position, element, value) :
+        # moves the hole at position down until value fits, then fills it
+        elements = self._elements
+        priorities = self._priorities
+        index = self._index
+        d = self._d
+        size = len(elements)
+        first = d * position + 1
+        while first < size :
+            last = min(first + d, size)
+            min_value = min(priorities[first:last])
+            if min_value >= value :
+                break
+            child = priorities.index(min_value, first, last)
+            moved = elements[child]
+            elements[position] = moved
+            priorities[position] = min_value
+            index[moved] = position
+            position = child
+            first = d * position + 1
+        elements[position] = element
+        priorities[position] = value
+        index[element] = position
+
+class PairingPQInts :
+    """Pairing heap of integers in the interval [0,n), with the same methods as
+    PQInts.  Decreasing a priority takes amortized O(1) time (Fredman et al.,
+    1986), compared to O(log n) for a binary heap.  The links of the heap are
+    kept in flat lists indexed by element, with -1 for no link."""
+
+    __slots__ = [ '_child', '_sibling', '_prev', '_priority', '_in', '_root', '_size' ]
+
+    def __init__(self, n) :
+        """Initializes an empty PQ, but configured to support
+        integers in the interval [0,n) as the elements."""
+        self._child = [ -1 ] * n
+        self._sibling = [ -1 ] * n
+        # previous sibling, or parent for a leftmost child
+        self._prev = [ -1 ] * n
+        self._priority = [ None ] * n
+        self._in = bytearray(n)
+        self._root = -1
+        self._size = 0
+
+    def size(self) :
+        """Size of the PQ."""
+        return self._size
+
+    def is_empty(self) :
+        """Returns True if PQ is empty and False otherwise."""
+        return self._size == 0
+
+    def insert(self, element, value) :
+        """Adds an element to the PQ with a specified priority.
+
+        Adds the element to the PQ provided PQ doesn't already contain it.
+        Does nothing if the PQ already contains the element.
+
+        Returns True if element added and False if already present.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The priority of the element.
+        """
+        if self._in[element] :
+            return False
+        self._in[element] = 1
+        self._priority[element] = value
+        self._child[element] = self._sibling[element] = self._prev[element] = -1
+        self._root = element if self._root < 0 else self._meld(self._root, element)
+        self._size += 1
+        return True
+
+    def insert_all(self, pairs) :
+        """Adds a list of (element, value) pairs to the PQ.
+
+        Adds the (element, value) pairs from the list pairs to the PQ.  Only the
+        pairs for which element is not already in the PQ are added.
+
+        Keyword arguments:
+        pairs -- A list of 2-tuples of the form (element, value) where value is the priority of element.
+        """
+        for el, val in pairs :
+            self.insert(el, val)
+
+    def peek_min(self) :
+        """Returns, but does not remove, the element with the minimum priority value."""
+        return self._root
+
+    def extract_min(self) :
+        """Removes and returns the element with minimum priority value."""
+        min_element = self._root
+        self._root = self._merge_pairs(self._child[min_element])
+        self._in[min_element] = 0
+        self._size -= 1
+        return min_element
+
+    def contains(self, element) :
+        """Returns True if element is in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._in[element] == 1
+
+    def get_priority(self, element) :
+        """Gets the current priority of the specified element.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._priority[element]
+
+    def change_priority(self, element, value) :
+        """Changes the priority of an element in the PQ.
+
+        Changes the priority of an element that is in the PQ.
+        Does nothing if the PQ doesn't contains the element.
+
+        Returns True if element is present in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The new priority for the element.
+        """
+        if not self._in[element] :
+            return False
+        if value < self._priority[element] :
+            self._priority[element] = value
+            if element != self._root :
+                self._cut(element)
+                self._root = self._meld(self._root, element)
+        elif value > self._priority[element] :
+            # an increase is a delete followed by an insert
+            self._priority[element] = value
+            if element == self._root :
+                self._root = self._merge_pairs(self._child[element])
+            else :
+                self._cut(element)
+                rest = self._merge_pairs(self._child[element])
+                if rest >= 0 :
+                    self._root = self._meld(self._root, rest)
+            self._child[element] = -1
+            self._root = element if self._root < 0 else self._meld(self._root, element)
+        return True
+
+    def _meld(self, a, b) :
+        # links two roots, making the one with larger priority the leftmost
+        # child of the other, and returns the new root
+        if self._priority[b] < self._priority[a] :
+            a, b = b, a
+        first = self._child[a]
+        self._sibling[b] = first
+        if first >= 0 :
+            self._prev[first] = b
+        self._prev[b] = a
+        self._child[a] = b
+        return a
+
+    def _cut(self, element) :
+        # detaches the subtree rooted at element from its parent
+        prev = self._prev[element]
+        next = self._sibling[element]
+        if self._child[prev] == element :
+            self._child[prev] = next
+        else :
+            self._sibling[prev] = next
+        if next >= 0 :
+            self._prev[next] = prev
+        self._sibling[element] = self._prev[element] = -1
+
+    def _merge_pairs(self, first) :
+        # two pass pairing of a list of siblings into one heap: meld pairs
+        # left to right, then meld the results right to left
+        subtrees = []
+        while first >= 0 :
+            next = self._sibling[first]
+            self._sibling[first] = self._prev[first] = -1
+            subtrees.append(first)
+            first = next
+        if len(subtrees) == 0 :
+            return -1
+        paired = [ self._meld(subtrees[i], subtrees[i+1]) for i in range(0, len(subtrees) - 1, 2) ]
+        if len(subtrees) % 2 == 1 :
+            paired.append(subtrees[-1])
+        root = paired.pop()
+        while len(paired) > 0 :
+            root = self._meld(paired.pop(), root)
+        return root
+
+class FibonacciPQInts :
+    """Fibonacci heap of integers in the interval [0,n), with the same methods
+    as PQInts.  Decreasing a priority takes amortized O(1) time (Fredman and
+    Tarjan, 1987; Chapter 19 of the textbook).  The circular sibling lists and
+    other links are kept in flat lists indexed by element, with -1 for no link."""
+
+    __slots__ = [ '_parent', '_child', '_left', '_right', '_degree', '_mark',
+                  '_priority', '_in', '_min', '_size' ]
+
+    def __init__(self, n) :
+        """Initializes an empty PQ, but configured to support
+        integers in the interval [0,n) as the elements."""
+        self._parent = [ -1 ] * n
+        self._child = [ -1 ] * n
+        self._left = [ -1 ] * n
+        self._right = [ -1 ] * n
+        self._degree = [ 0 ] * n
+        self._mark = bytearray(n)
+        self._priority = [ None ] * n
+        self._in = bytearray(n)
+        self._min = -1
+        self._size = 0
+
+    def size(self) :
+        """Size of the PQ."""
+        return self._size
+
+    def is_empty(self) :
+        """Returns True if PQ is empty and False otherwise."""
+        return self._size == 0
+
+    def insert(self, element, value) :
+        """Adds an element to the PQ with a specified priority.
+
+        Adds the element to the PQ provided PQ doesn't already contain it.
+        Does nothing if the PQ already contains the element.
+
+        Returns True if element added and False if already present.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The priority of the element.
+        """
+        if self._in[element] :
+            return False
+        self._in[element] = 1
+        self._priority[element] = value
+        self._parent[element] = self._child[element] = -1
+        self._degree[element] = 0
+        self._mark[element] = 0
+        self._add_root(element)
+        self._size += 1
+        return True
+
+    def insert_all(self, pairs) :
+        """Adds a list of (element, value) pairs to the PQ.
+
+        Adds the (element, value) pairs from the list pairs to the PQ.  Only the
+        pairs for which element is not already in the PQ are added.
+
+        Keyword arguments:
+        pairs -- A list of 2-tuples of the form (element, value) where value is the priority of element.
+        """
+        for el, val in pairs :
+            self.insert(el, val)
+
+    def peek_min(self) :
+        """Returns, but does not remove, the element with the minimum priority value."""
+        return self._min
+
+    def extract_min(self) :
+        """Removes and returns the element with minimum priority value."""
+        z = self._min
+        # move the children of z to the root list
+        x = self._child[z]
+        while x >= 0 :
+            next = self._right[x]
+            if next == self._child[z] :
+                next = -1
+            self._parent[x] = -1
+            self._splice(x, z)
+            x = next
+        self._child[z] = -1
+        if self._right[z] == z :
+            self._min = -1
+        else :
+            self._min = self._right[z]
+            self._unlink(z)
+            self._consolidate()
+        self._in[z] = 0
+        self._size -= 1
+        return z
+
+    def contains(self, element) :
+        """Returns True if element is in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._in[element] == 1
+
+    def get_priority(self, element) :
+        """Gets the current priority of the specified element.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._priority[element]
+
+    def change_priority(self, element, value) :
+        """Changes the priority of an element in the PQ.
+
+        Changes the priority of an element that is in the PQ.
+        Does nothing if the PQ doesn't contains the element.
+
+        Returns True if element is present in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The new priority for the element.
+        """
+        if not self._in[element] :
+            return False
+        if value < self._priority[element] :
+            self._decrease_key(element, value)
+        elif value > self._priority[element] :
+            # an increase is a delete followed by an insert
+            self._decrease_key(element, -math.inf)
+            self.extract_min()
+            self.insert(element, value)
+        return True
+
+    def _decrease_key(self, x, value) :
+        self._priority[x] = value
+        y = self._parent[x]
+        if y >= 0 and value < self._priority[y] :
+            self._cut(x, y)
+            # cascading cut
+            z = self._parent[y]
+            while z >= 0 :
+                if not self._mark[y] :
+                    self._mark[y] = 1
+                    break
+                self._cut(y, z)
+                y = z
+                z = self._parent[y]
+        if value < self._priority[self._min] :
+            self._min = x
+
+    def _cut(self, x, y) :
+        # moves x from the child list of y to the root list
+        if self._right[x] == x :
+            self._child[y] = -1
+        else :
+            if self._child[y] == x :
+                self._child[y] = self._right[x]
+            self._unlink(x)
+        self._degree[y] -= 1
+        self._parent[x] = -1
+        self._mark[x] = 0
+        self._splice(x, self._min)
+
+    def _consolidate(self) :
+        roots = []
+        x = self._min
+        while True :
+            roots.append(x)
+            x = self._right[x]
+            if x == self._min :
+                break
+        by_degree = {}
+        for x in roots :
+            d = self._degree[x]
+            while d in by_degree :
+                y = by_degree.pop(d)
+                if self._priority[y] < self._priority[x] :
+                    x, y = y, x
+                self._link(y, x)
+                d += 1
+            by_degree[d] = x
+        self._min = -1
+        for x in by_degree.values() :
+            self._left[x] = self._right[x] = x
+            self._add_root(x)
+
+    def _link(self, y, x) :
+        # makes root y a child of root x
+        self._unlink(y)
+        child = self._child[x]
+        if child < 0 :
+            self._left[y] = self._right[y] = y
+            self._child[x] = y
+        else :
+            self._splice(y, child)
+        self._parent[y] = x
+        self._degree[x] += 1
+        self._mark[y] = 0
+
+    def _add_root(self, x) :
+        if self._min < 0 :
+            self._left[x] = self._right[x] = x
+            self._min = x
+        else :
+            self._splice(x, self._min)
+            if self._priority[x] < self._priority[self._min] :
+                self._min = x
+
+    def _splice(self, x, y) :
+        # inserts x into the circular list containing y, to the right of y
+        right = self._right[y]
+        self._left[x] = y
+        self._right[x] = right
+        self._left[right] = x
+        self._right[y] = x
+
+    def _unlink(self, x) :
+        # removes x from its circular list
+        self._right[self._left[x]] = self._right[x]
+        self._left[self._right[x]] = self._left[x]
+
+class BucketPQInts :
+    """Bucket queue (Dial, 1969) of integers in the interval [0,n), with the
+    same methods as PQInts, for nonnegative integer priorities that are
+    extracted in nondecreasing order, as in Dijkstra's algorithm.  All finite
+    priorities in the PQ must lie within max_gap of the last extracted minimum,
+    which holds in Dijkstra's algorithm if max_gap is the largest edge weight.
+    Elements with priority math.inf are kept apart and extracted last."""
+
+    __slots__ = [ '_buckets', '_infinite', '_priority', '_in', '_cursor', '_finite', '_size' ]
+
+    def __init__(self, n, max_gap) :
+        """Initializes an empty PQ, but configured to support
+        integers in the interval [0,n) as the elements.
+
+        Keyword arguments:
+        n -- number of possible elements.
+        max_gap -- upper bound on the difference between any finite priority
+                   in the PQ and the last extracted minimum.
+        """
+        self._buckets = [ set() for i in range(max_gap + 1) ]
+        self._infinite = set()
+        self._priority = [ None ] * n
+        self._in = bytearray(n)
+        self._cursor = 0
+        self._finite = 0
+        self._size = 0
+
+    def size(self) :
+        """Size of the PQ."""
+        return self._size
+
+    def is_empty(self) :
+        """Returns True if PQ is empty and False otherwise."""
+        return self._size == 0
+
+    def insert(self, element, value) :
+        """Adds an element to the PQ with a specified priority.
+
+        Adds the element to the PQ provided PQ doesn't already contain it.
+        Does nothing if the PQ already contains the element.
+
+        Returns True if element added and False if already present.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The priority of the element.
+        """
+        if self._in[element] :
+            return False
+        self._in[element] = 1
+        self._size += 1
+        self._add(element, value)
+        return True
+
+    def insert_all(self, pairs) :
+        """Adds a list of (element, value) pairs to the PQ.
+
+        Adds the (element, value) pairs from the list pairs to the PQ.  Only the
+        pairs for which element is not already in the PQ are added.
+
+        Keyword arguments:
+        pairs -- A list of 2-tuples of the form (element, value) where value is the priority of element.
+        """
+        for el, val in pairs :
+            self.insert(el, val)
+
+    def peek_min(self) :
+        """Returns, but does not remove, the element with the minimum priority value."""
+        return next(iter(self._min_bucket()))
+
+    def extract_min(self) :
+        """Removes and returns the element with minimum priority value."""
+        min_element = self._min_bucket().pop()
+        if self._priority[min_element] != math.inf :
+            self._finite -= 1
+        self._in[min_element] = 0
+        self._size -= 1
+        return min_element
+
+    def contains(self, element) :
+        """Returns True if element is in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._in[element] == 1
+
+    def get_priority(self, element) :
+        """Gets the current priority of the specified element.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._priority[element]
+
+    def change_priority(self, element, value) :
+        """Changes the priority of an element in the PQ.
+
+        Changes the priority of an element that is in the PQ.
+        Does nothing if the PQ doesn't contains the element.
+
+        Returns True if element is present in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The new priority for the element.
+        """
+        if not self._in[element] :
+            return False
+        old = self._priority[element]
+        if old == math.inf :
+            self._infinite.discard(element)
+        else :
+            self._buckets[old % len(self._buckets)].discard(element)
+            self._finite -= 1
+        self._add(element, value)
+        return True
+
+    def _add(self, element, value) :
+        self._priority[element] = value
+        if value == math.inf :
+            self._infinite.add(element)
+        else :
+            self._buckets[value % len(self._buckets)].add(element)
+            self._finite += 1
+            if value < self._cursor :
+                self._cursor = value
+
+    def _min_bucket(self) :
+        # advances the cursor to the first nonempty bucket
+        if self._finite == 0 :
+            return self._infinite
+        buckets = self._buckets
+        while len(buckets[self._cursor % len(buckets)]) == 0 :
+            self._cursor += 1
+        return buckets[self._cursor % len(buckets)]
+
+class RadixPQInts :
+    """Radix heap (Ahuja, Mehlhorn, Orlin, and Tarjan, 1990) of integers in the
+    interval [0,n), with the same methods as PQInts, for nonnegative integer
+    priorities that are extracted in nondecreasing order, as in Dijkstra's
+    algorithm.  No priority may be set lower than the minimum priority at the
+    time of the last call to extract_min or peek_min.
+    Elements with priority math.inf are kept apart and extracted last.
+
+    Bucket i holds the elements whose priority first differs from the last
+    extracted minimum in bit i-1, so an element moves to lower buckets at most
+    once per bit of its priority."""
+
+    __slots__ = [ '_buckets', '_bucket', '_infinite', '_priority', '_in', '_last', '_finite', '_size' ]
+
+    def __init__(self, n) :
+        """Initializes an empty PQ, but configured to support
+        integers in the interval [0,n) as the elements."""
+        self._buckets = [ set() ]
+        self._bucket = [ -1 ] * n
+        self._infinite = set()
+        self._priority = [ None ] * n
+        self._in = bytearray(n)
+        self._last = 0
+        self._finite = 0
+        self._size = 0
+
+    def size(self) :
+        """Size of the PQ."""
+        return self._size
+
+    def is_empty(self) :
+        """Returns True if PQ is empty and False otherwise."""
+        return self._size == 0
+
+    def insert(self, element, value) :
+        """Adds an element to the PQ with a specified priority.
+
+        Adds the element to the PQ provided PQ doesn't already contain it.
+        Does nothing if the PQ already contains the element.
+
+        Returns True if element added and False if already present.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The priority of the element.
+        """
+        if self._in[element] :
+            return False
+        self._in[element] = 1
+        self._size += 1
+        self._add(element, value)
+        return True
+
+    def insert_all(self, pairs) :
+        """Adds a list of (element, value) pairs to the PQ.
+
+        Adds the (element, value) pairs from the list pairs to the PQ.  Only the
+        pairs for which element is not already in the PQ are added.
+
+        Keyword arguments:
+        pairs -- A list of 2-tuples of the form (element, value) where value is the priority of element.
+        """
+        for el, val in pairs :
+            self.insert(el, val)
+
+    def peek_min(self) :
+        """Returns, but does not remove, the element with the minimum priority value."""
+        return next(iter(self._min_bucket()))
+
+    def extract_min(self) :
+        """Removes and returns the element with minimum priority value."""
+        min_element = self._min_bucket().pop()
+        if self._priority[min_element] != math.inf :
+            self._finite -= 1
+        self._in[min_element] = 0
+        self._size -= 1
+        return min_element
+
+    def contains(self, element) :
+        """Returns True if element is in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._in[element] == 1
+
+    def get_priority(self, element) :
+        """Gets the current priority of the specified element.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._priority[element]
+
+    def change_priority(self, element, value) :
+        """Changes the priority of an element in the PQ.
+
+        Changes the priority of an element that is in the PQ.
+        Does nothing if the PQ doesn't contains the element.
+
+        Returns True if element is present in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The new priority for the element.
+        """
+        if not self._in[element] :
+            return False
+        if self._priority[element] == math.inf :
+            self._infinite.discard(element)
+        else :
+            self._buckets[self._bucket[element]].discard(element)
+            self._finite -= 1
+        self._add(element, value)
+        return True
+
+    def _add(self, element, value) :
+        self._priority[element] = value
+        if value == math.inf :
+            self._infinite.add(element)
+        else :
+            i = (value ^ self._last).bit_length()
+            while i >= len(self._buckets) :
+                self._buckets.append(set())
+            self._buckets[i].add(element)
+            self._bucket[element] = i
+            self._finite += 1
+
+    def _min_bucket(self) :
+        # makes bucket 0 (priorities equal to the last minimum) nonempty, if
+        # possible, by redistributing the lowest nonempty bucket about its minimum
+        if self._finite == 0 :
+            return self._infinite
+        buckets = self._buckets
+        if len(buckets[0]) == 0 :
+            i = 1
+            while len(buckets[i]) == 0 :
+                i += 1
+            moving = buckets[i]
+            buckets[i] = set()
+            priority = self._priority
+            bucket = self._bucket
+            self._last = last = min(priority[x] for x in moving)
+            for x in moving :
+                j = (priority[x] ^ last).bit_length()
+                buckets[j].add(x)
+                bucket[x] = j
+        return buckets[0]
+
+class TournamentPQInts :
+    """Array based PQ of integers in the interval [0,n), with the same methods
+    as PQInts, that keeps a flat tournament (winner) tree over the array of
+    priorities, so that the minimum is always at the root.  Like ArrayPQInts,
+    the priorities are stored directly by element, but finding the minimum
+    takes O(1) time instead of a scan of the array.  Decreasing a priority
+    only climbs the tree until the element loses a match, usually after a
+    level or two, and other changes replay one path of O(log n) matches."""
+
+    __slots__ = [ '_tree', '_leaves', '_priority', '_size' ]
+
+    def __init__(self, n) :
+        """Initializes an empty PQ, but configured to support
+        integers in the interval [0,n) as the elements."""
+        leaves = 1
+        while leaves < n :
+            leaves *= 2
+        self._leaves = leaves
+        # node i has children 2i and 2i+1, leaf for element e is leaves + e,
+        # and each node holds the winning element of its subtree, or -1
+        self._tree = [ -1 ] * (2 * leaves)
+        self._priority = [ None ] * n
+        self._size = 0
+
+    def size(self) :
+        """Size of the PQ."""
+        return self._size
+
+    def is_empty(self) :
+        """Returns True if PQ is empty and False otherwise."""
+        return self._size == 0
+
+    def insert(self, element, value) :
+        """Adds an element to the PQ with a specified priority.
+
+        Adds the element to the PQ provided PQ doesn't already contain it.
+        Does nothing if the PQ already contains the element.
+
+        Returns True if element added and False if already present.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The priority of the element.
+        """
+        leaf = self._leaves + element
+        if self._tree[leaf] >= 0 :
+            return False
+        self._priority[element] = value
+        self._tree[leaf] = element
+        self._size += 1
+        self._improve(element)
+        return True
+
+    def insert_all(self, pairs) :
+        """Adds a list of (element, value) pairs to the PQ.
+
+        Adds the (element, value) pairs from the list pairs to the PQ.  Only the
+        pairs for which element is not already in the PQ are added.
+
+        Keyword arguments:
+        pairs -- A list of 2-tuples of the form (element, value) where value is the priority of element.
+        """
+        for el, val in pairs :
+            self.insert(el, val)
+
+    def peek_min(self) :
+        """Returns, but does not remove, the element with the minimum priority value."""
+        if self._size == 0 :
+            return None
+        return self._tree[1]
+
+    def extract_min(self) :
+        """Removes and returns the element with minimum priority value."""
+        if self._size == 0 :
+            return None
+        min_element = self._tree[1]
+        self._tree[self._leaves + min_element] = -1
+        self._size -= 1
+        self._replay(min_element)
+        return min_element
+
+    def contains(self, element) :
+        """Returns True if element is in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._tree[self._leaves + element] >= 0
+
+    def get_priority(self, element) :
+        """Gets the current priority of the specified element.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return self._priority[element]
+
+    def change_priority(self, element, value) :
+        """Changes the priority of an element in the PQ.
+
+        Changes the priority of an element that is in the PQ.
+        Does nothing if the PQ doesn't contains the element.
+
+        Returns True if element is present in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The new priority for the element.
+        """
+        if self._tree[self._leaves + element] < 0 :
+            return False
+        old = self._priority[element]
+        self._priority[element] = value
+        if value < old :
+            self._improve(element)
+        elif value > old :
+            self._replay(element)
+        return True
+
+    def _improve(self, element) :
+        # element's priority decreased: it takes over each match up the tree
+        # until it meets a winner that still beats it
+        tree = self._tree
+        priority = self._priority
+        value = priority[element]
+        node = (self._leaves + element) >> 1
+        while node > 0 :
+            winner = tree[node]
+            if winner != element :
+                if winner >= 0 and priority[winner] <= value :
+                    break
+                tree[node] = element
+            node >>= 1
+
+    def _replay(self, element) :
+        # recomputes the winners of all matches on the path from element's leaf
+        tree = self._tree
+        priority = self._priority
+        node = (self._leaves + element) >> 1
+        while node > 0 :
+            a = tree[2 * node]
+            b = tree[2 * node + 1]
+            if a < 0 or (b >= 0 and priority[b] < priority[a]) :
+                a = b
+            tree[node] = a
+            node >>= 1
+
+class NumpyArrayPQInts :
+    """Array based PQ of integers in the interval [0,n), with the same methods
+    as PQInts, like ArrayPQInts but with the priorities in a NumPy array, so
+    that finding the minimum is a single vectorized argmin.  Requires NumPy."""
+
+    __slots__ = [ '_key', '_in', '_size' ]
+
+    def __init__(self, n) :
+        """Initializes an empty PQ, but configured to support
+        integers in the interval [0,n) as the elements."""
+        if np is None :
+            raise ImportError("NumpyArrayPQInts requires numpy")
+        # priority of each element in the PQ, and infinity for the others
+        self._key = np.full(n, np.inf)
+        self._in = np.zeros(n, dtype=bool)
+        self._size = 0
+
+    def size(self) :
+        """Size of the PQ."""
+        return self._size
+
+    def is_empty(self) :
+        """Returns True if PQ is empty and False otherwise."""
+        return self._size == 0
+
+    def insert(self, element, value) :
+        """Adds an element to the PQ with a specified priority.
+
+        Adds the element to the PQ provided PQ doesn't already contain it.
+        Does nothing if the PQ already contains the element.
+
+        Returns True if element added and False if already present.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The priority of the element.
+        """
+        if self._in[element] :
+            return False
+        self._key[element] = value
+        self._in[element] = True
+        self._size += 1
+        return True
+
+    def insert_all(self, pairs) :
+        """Adds a list of (element, value) pairs to the PQ.
+
+        Adds the (element, value) pairs from the list pairs to the PQ.  Only the
+        pairs for which element is not already in the PQ are added.
+
+        Keyword arguments:
+        pairs -- A list of 2-tuples of the form (element, value) where value is the priority of element.
+        """
+        for el, val in pairs :
+            self.insert(el, val)
+
+    def peek_min(self) :
+        """Returns, but does not remove, the element with the minimum priority value."""
+        if self._size == 0 :
+            return None
+        min_element = int(self._key.argmin())
+        if not self._in[min_element] :
+            # only elements with infinite priority are left
+            min_element = int(self._in.argmax())
+        return min_element
+
+    def extract_min(self) :
+        """Removes and returns the element with minimum priority value."""
+        min_element = self.peek_min()
+        if min_element != None :
+            self._key[min_element] = np.inf
+            self._in[min_element] = False
+            self._size -= 1
+        return min_element
+
+    def contains(self, element) :
+        """Returns True if element is in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return bool(self._in[element])
+
+    def get_priority(self, element) :
+        """Gets the current priority of the specified element.
+
+        Keyword arguments:
+        element -- The element
+        """
+        return float(self._key[element])
+
+    def change_priority(self, element, value) :
+        """Changes the priority of an element in the PQ.
+
+        Changes the priority of an element that is in the PQ.
+        Does nothing if the PQ doesn't contains the element.
+
+        Returns True if element is present in the PQ and False otherwise.
+
+        Keyword arguments:
+        element -- The element to add.
+        value -- The new priority for the element.
+        """
+        if self._in[element] :
+            self._key[element] = value
+            return True
+        return False
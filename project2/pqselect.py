@@ -0,0 +1,180 @@
+import json
+import math
+import os
+import random
+import time
+from intpq import PQInts, ArrayPQInts, DaryPQInts, RadixPQInts, TournamentPQInts
+
+# Priority queues that WeightedGraph.dijkstra and mst_prim choose among, as
+# name: (constructor, how the cost of extract_min grows with the number of
+# elements, how the cost of change_priority grows, whether the priorities
+# must be monotone integers as in Dijkstra with integer weights)
+BACKENDS = {
+    "array" : (ArrayPQInts, "linear", "const", False),
+    "tournament" : (TournamentPQInts, "log", "log", False),
+    "binheap" : (PQInts, "log", "log", False),
+    "dary" : (lambda n : DaryPQInts(n, 4), "log", "log", False),
+    "radix" : (RadixPQInts, "log", "const", True),
+}
+
+# where calibrate saves the cost model, in the user's cache directory rather
+# than next to the source
+_CACHE_DIR = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+COST_MODEL_FILE = os.environ.get("PQ_COST_MODEL", os.path.join(_CACHE_DIR, "pq_cost_model.json"))
+
+# the cost model used until calibrate is run, as name: per op cost
+# coefficients [a, b] of a + b * growth(n), fit on a typical machine
+DEFAULT_COST_MODEL = {
+    "array" : { "extract" : [1.1e-06, 8.3e-08], "change_priority" : [1.6e-07, 0] },
+    "tournament" : { "extract" : [0, 2.9e-07], "change_priority" : [3.7e-07, 2.4e-08] },
+    "binheap" : { "extract" : [0, 6.0e-07], "change_priority" : [6.8e-07, 0] },
+    "dary" : { "extract" : [1.9e-06, 2.5e-07], "change_priority" : [4.4e-07, 0] },
+    "radix" : { "extract" : [2.5e-06, 0], "change_priority" : [4.7e-07, 0] },
+}
+
+_GROWTH = {
+    "const" : lambda n : 0,
+    "log" : lambda n : math.log2(max(n, 2)),
+    "linear" : lambda n : n,
+}
+
+# sizes of the PQs that the micro-benchmark times
+_CALIBRATION_SIZES = (128, 1024)
+_REPEAT = 3
+
+_model = None
+
+def make_pq(name, n) :
+    """Constructs an empty priority queue of one of the BACKENDS.
+
+    Keyword arguments:
+    name -- the name of the backend
+    n -- number of possible elements
+    """
+    if name not in BACKENDS :
+        raise ValueError("unknown priority queue: " + str(name))
+    return BACKENDS[name][0](n)
+
+def choose_pq(v, e, monotone_integer=False) :
+    """Returns the name of the backend predicted to be fastest for Dijkstra's
+    or Prim's algorithm on a graph of a given size, by the cost model.
+
+    Keyword arguments:
+    v -- number of vertexes
+    e -- number of adjacency list entries (twice the edges of an undirected graph)
+    monotone_integer -- True if the priorities are integers extracted in
+                        nondecreasing order, as in Dijkstra's algorithm on a graph
+                        with integer weights
+    """
+    model = load_cost_model()
+    # expected number of priority decreases on a graph with random weights
+    decreases = min(e, v * math.log(1 + e / max(v, 1)))
+    best = None
+    for name, (make, extract_growth, decrease_growth, monotone) in BACKENDS.items() :
+        if monotone and not monotone_integer :
+            continue
+        costs = model[name]
+        cost = v * _predict(costs["extract"], extract_growth, v) \
+               + decreases * _predict(costs["change_priority"], decrease_growth, v)
+        if best is None or cost < best[0] :
+            best = (cost, name)
+    return best[1]
+
+def load_cost_model(filename=None) :
+    """Returns the cost model, reading it from the file that calibrate
+    saves it to, or DEFAULT_COST_MODEL if there is no valid one there.
+
+    Keyword arguments:
+    filename -- the cost model file (default is COST_MODEL_FILE)
+    """
+    global _model
+    if filename is None :
+        if _model is not None :
+            return _model
+        filename = COST_MODEL_FILE
+    try :
+        with open(filename) as f :
+            model = json.load(f)
+        if not isinstance(model, dict) or set(model) != set(BACKENDS) :
+            model = DEFAULT_COST_MODEL
+    except (OSError, ValueError) :
+        model = DEFAULT_COST_MODEL
+    if filename == COST_MODEL_FILE :
+        _model = model
+    return model
+
+def calibrate(filename=None) :
+    """Times extract_min and change_priority for each backend on PQs of a
+    couple of sizes, fits the cost model to the timings, and saves it.
+    Returns the cost model.  This is only run when asked for, e.g. by
+    running this module as a script.
+
+    Keyword arguments:
+    filename -- where to save the cost model (default is COST_MODEL_FILE)
+    """
+    global _model
+    if filename is None :
+        filename = COST_MODEL_FILE
+    model = {}
+    for name, (make, extract_growth, decrease_growth, monotone) in BACKENDS.items() :
+        # the fastest of a few repetitions is the least disturbed by noise
+        extract = [ min(_time_extract(make, n) for i in range(_REPEAT)) for n in _CALIBRATION_SIZES ]
+        decrease = [ min(_time_change_priority(make, n) for i in range(_REPEAT)) for n in _CALIBRATION_SIZES ]
+        model[name] = {
+            "extract" : _fit(extract, extract_growth),
+            "change_priority" : _fit(decrease, decrease_growth),
+        }
+    try :
+        directory = os.path.dirname(filename)
+        if directory != "" :
+            os.makedirs(directory, exist_ok=True)
+        with open(filename, "w") as f :
+            json.dump(model, f, indent=1)
+    except OSError :
+        pass
+    if filename == COST_MODEL_FILE :
+        _model = model
+    return model
+
+def _predict(coefficients, growth, n) :
+    a, b = coefficients
+    return a + b * _GROWTH[growth](n)
+
+def _fit(per_op, growth) :
+    # per op cost a + b * growth(n), through the timings at the two sizes
+    n1, n2 = _CALIBRATION_SIZES
+    c1, c2 = per_op
+    f1, f2 = _GROWTH[growth](n1), _GROWTH[growth](n2)
+    if f1 == f2 :
+        return [ (c1 + c2) / 2, 0 ]
+    b = max(0, (c2 - c1) / (f2 - f1))
+    return [ max(0, c1 - b * f1), b ]
+
+def _time_extract(make, n) :
+    # time per extract_min to empty a PQ of n elements
+    pq = make(n)
+    for element in range(n) :
+        pq.insert(element, random.randrange(10 * n))
+    start = time.perf_counter()
+    while not pq.is_empty() :
+        pq.extract_min()
+    return (time.perf_counter() - start) / n
+
+def _time_change_priority(make, n) :
+    # time per change_priority that decreases a random element's priority
+    pq = make(n)
+    priority = [ 10 * n + random.randrange(10 * n) for element in range(n) ]
+    for element in range(n) :
+        pq.insert(element, priority[element])
+    changes = [ random.randrange(n) for i in range(4 * n) ]
+    start = time.perf_counter()
+    for element in changes :
+        priority[element] -= 1
+        pq.change_priority(element, priority[element])
+    return (time.perf_counter() - start) / len(changes)
+
+if __name__ == "__main__" :
+    model = calibrate()
+    print("saved the cost model to", COST_MODEL_FILE)
+    for name, costs in model.items() :
+        print(name, costs)
@@ -169,7 +169,7 @@ def random_weighted_graph(v,e,min_w,max_w) :
 
 
 def time_shortest_path_algs() :
-    """Generates a table of timing results comparing two versions of Dijkstra"""
+    """Generates a table of timing results comparing four versions of Dijkstra"""
     # create a list of the edge / vertex numbers in tuples to generate each graph
     graph_params = [(64, 2016), (128, 8128), (256, 32640), (512, 130816), (1024, 523776), (64, 128),
                     (128, 256), (256, 512), (512, 1024), (1024, 2048)]
@@ -181,6 +181,7 @@ def time_shortest_path_algs() :
     num_runs = [50, 50, 50, 50, 50, 300, 250, 200, 50, 50]
     # initialize globals for timeit
     dijkstraArrayPaths, dijkstraBinHeapPaths = [], []
+    dijkstraPairingPaths, dijkstraFibonacciPaths = [], []
     def graphParams():
         # use for setup parameter of timeit
         nonlocal vertices
@@ -196,6 +197,16 @@ def time_shortest_path_algs() :
         nonlocal G
         nonlocal dijkstraBinHeapPaths
         dijkstraBinHeapPaths = G.dijkstra_binheap(0)
+    def pairingTimeParams():
+        # use for first parameter when timing pairing heap based
+        nonlocal G
+        nonlocal dijkstraPairingPaths
+        dijkstraPairingPaths = G.dijkstra_pairing(0)
+    def fibonacciTimeParams():
+        # use for first parameter when timing fibonacci heap based
+        nonlocal G
+        nonlocal dijkstraFibonacciPaths
+        dijkstraFibonacciPaths = G.dijkstra_fibonacci(0)
 # for each tuple in the list of graph parameters,
     for i in range(len(graph_params)):
         # get the vertex and edge counts
@@ -203,12 +214,14 @@ def time_shortest_path_algs() :
         # call the random weighted graph function to generate a graph of those parameters
         G = random_weighted_graph(vertices, edges, 1, 100)
         # initialize timeit parameters
-        # calculate runtimes using the array and binheap functions
+        # calculate runtimes using the array, binheap, pairing and fibonacci functions
         arrayTime = timeit(arrayTimeParams, setup=graphParams, number=num_runs[i])
         binHeapTime = timeit(binHeapTimeParams, setup=graphParams, number=num_runs[i])
-        # add the vertices, edges, array time, binheap time to a tuple in that order
+        pairingTime = timeit(pairingTimeParams, setup=graphParams, number=num_runs[i])
+        fibonacciTime = timeit(fibonacciTimeParams, setup=graphParams, number=num_runs[i])
+        # add the vertices, edges, and the four times to a tuple in that order
         # add the tuple to the list to return
-        results.append((vertices, edges, arrayTime, binHeapTime))
+        results.append((vertices, edges, arrayTime, binHeapTime, pairingTime, fibonacciTime))
     # return the list of runtime results in a loop to be printed
     return results
 
@@ -221,23 +234,28 @@ if __name__ == "__main__" :
     #
     # test timing algorithm and printing results
     time_array = time_shortest_path_algs()
-    print(f"{'# Vertices' : <11}{'# Edges' : <19}{'Time [Array]' : <20}{'Time [Binary Heap]' : <39}")
+    print(f"{'# Vertices' : <11}{'# Edges' : <19}{'Time [Array]' : <20}{'Time [Binary Heap]' : <20}"
+          f"{'Time [Pairing Heap]' : <22}{'Time [Fibonacci Heap]' : <22}")
     for i in range(len(time_array)):
-        v, e, timeArr, timeBin = time_array[i].__iter__()
-        print(f"{v : <11}{e : <19}{'%.3f' % timeArr : <20}{'%.3f' % timeBin : <39}")
+        v, e, timeArr, timeBin, timePair, timeFib = time_array[i].__iter__()
+        print(f"{v : <11}{e : <19}{'%.3f' % timeArr : <20}{'%.3f' % timeBin : <20}"
+              f"{'%.3f' % timePair : <22}{'%.3f' % timeFib : <22}")
     #
     # test file creation
     # create a file to hold output
     # pass x as second parameter for creating and writing to a new file
     with open("timing results.txt", "x") as file:
-        # create a string for table header (vertices, edges, array time, binheap time)
-        header = ["# Vertices", "# Edges", "Time [Array]", "Time [Binary Heap]"]
+        # create a string for table header (vertices, edges, array, binheap, pairing, fibonacci times)
+        header = ["# Vertices", "# Edges", "Time [Array]", "Time [Binary Heap]",
+                  "Time [Pairing Heap]", "Time [Fibonacci Heap]"]
         # add table header to the file
-        file.write(f"{header[0] : <11}{header[1] : <19}{header[2] : <20}{header[3] : <39}")
+        file.write(f"{header[0] : <11}{header[1] : <19}{header[2] : <20}{header[3] : <20}"
+                   f"{header[4] : <22}{header[5] : <22}")
         file.write("\n")
         # for each tuple in the runtime list,
         for i in range(len(time_array)):
-            v, e, timeArr, timeBin = time_array[i].__iter__()
+            v, e, timeArr, timeBin, timePair, timeFib = time_array[i].__iter__()
             # add tuple values to the file
-            file.write(f"{v : <11}{e : <19}{'%.3f' % timeArr : <20}{'%.3f' % timeBin : <39}")
+            file.write(f"{v : <11}{e : <19}{'%.3f' % timeArr : <20}{'%.3f' % timeBin : <20}"
+                       f"{'%.3f' % timePair : <22}{'%.3f' % timeFib : <22}")
             file.write("\n")
\ No newline at end of file